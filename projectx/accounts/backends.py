@@ -0,0 +1,55 @@
+"""
+Log in with a username or an email address.
+
+The account is found with one query: ``username = x OR LOWER(email) = lower(x)``,
+served by the username unique index and the LOWER(email) index (migration
+0002). At most one password hash is computed per attempt, including when no
+account matches, so response times don't reveal which accounts exist.
+Attempts over the accounts.throttling limits are refused before hashing;
+the limits are per account, whichever identifier names it.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.db.models import Case, Q, When
+from django.db.models.functions import Lower
+
+from . import throttling
+
+UserModel = get_user_model()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+        identifier = username.strip()
+        user = self.get_account(identifier)
+        if request is not None:
+            throttling.remember_account(request, identifier, user)
+            if throttling.is_blocked(request, identifier):
+                # Stops authenticate() from trying other backends, too.
+                raise PermissionDenied
+        if user is None:
+            # Hash anyway so a miss takes as long as a wrong password.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_account(self, identifier):
+        """The user whose username is ``identifier``, else the only one with that email (any case)."""
+        # The username match sorts first, so accounts sharing the email can't crowd it out of the slice.
+        candidates = list(
+            UserModel._default_manager.annotate(email_lower=Lower('email'))
+            .filter(Q(username=identifier) | Q(email_lower=identifier.lower()))
+            .order_by(Case(When(username=identifier, then=0), default=1))[:2]
+        )
+        for user in candidates:
+            if user.username == identifier:
+                return user
+        # Emails aren't unique; an address shared by two accounts can't be used to log in.
+        return candidates[0] if len(candidates) == 1 else None
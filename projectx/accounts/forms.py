@@ -27,7 +27,8 @@ class UserRegistrationForm(UserCreationForm):
             user.save()
             # Create user profile
             UserProfile.objects.get_or_create(user=user, defaults={'is_admin': False})
-       
+        return user
+
 
 class AdminRegistrationForm(UserCreationForm):
     """Form for admin registration with password verification"""
@@ -0,0 +1,25 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .roles import get_user_role
+
+
+class UserRoleMiddleware:
+    """Adds a lazy ``request.user_role``, resolved at most once per request.
+
+    Works in both sync and async stacks, so it doesn't force a thread hop
+    in front of async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.user_role = SimpleLazyObject(lambda: get_user_role(request.user))
+        # In an async stack this returns the coroutine of the next handler for the caller to await.
+        return self.get_response(request)
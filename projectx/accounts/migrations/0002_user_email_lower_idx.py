@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Case-insensitive email lookups at login (accounts.backends) use LOWER(email)."""
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            reverse_sql='DROP INDEX auth_user_email_lower_idx',
+        ),
+    ]
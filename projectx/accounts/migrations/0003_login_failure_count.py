@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginFailureCount',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('window_start', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -17,3 +17,13 @@ class UserProfile(models.Model):
     @property
     def email(self):
         return self.user.email
+
+
+class LoginFailureCount(models.Model):
+    """Failed logins for one client IP or account in the window starting at window_start (accounts.throttling)"""
+    key = models.CharField(max_length=100, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    window_start = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.count} since {self.window_start}"
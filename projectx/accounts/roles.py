@@ -0,0 +1,72 @@
+"""
+Per-request user role resolution.
+
+``get_user_role(user)`` answers "has a profile?" and "is an admin?" with at
+most one UserProfile query per user: the answer is memoized on the user
+object for the rest of the request and cached across requests in a
+per-user namespace, whose version is bumped when the profile is saved or
+deleted (see accounts.signals). ``aget_user_role`` is the same for async
+views.
+"""
+from dataclasses import dataclass
+
+from caching.namespaces import Namespace
+
+from .models import UserProfile
+
+CACHE_TIMEOUT = 60 * 15
+
+
+@dataclass(frozen=True)
+class UserRole:
+    has_profile: bool
+    is_admin: bool
+
+
+ANONYMOUS_ROLE = UserRole(has_profile=False, is_admin=False)
+
+
+def namespace(user_id) -> Namespace:
+    return Namespace(f'accounts:role:{user_id}')
+
+
+def get_user_role(user) -> UserRole:
+    if not user.is_authenticated:
+        return ANONYMOUS_ROLE
+    role = getattr(user, '_role_cache', None)
+    if role is None:
+        profiles = namespace(user.pk)
+        key = profiles.key('profile')
+        profile = profiles.cache.get(key)
+        if profile is None:
+            is_admin = UserProfile.objects.filter(user_id=user.pk).values_list('is_admin', flat=True).first()
+            profile = (is_admin is not None, bool(is_admin))
+            profiles.cache.set(key, profile, CACHE_TIMEOUT)
+        has_profile, profile_admin = profile
+        # Fall back to superuser status if the UserProfile doesn't exist
+        role = UserRole(has_profile=has_profile, is_admin=profile_admin or user.is_superuser)
+        user._role_cache = role
+    return role
+
+
+async def aget_user_role(user) -> UserRole:
+    """Async get_user_role(); memoizes on ``user`` the same way, so sync callers reuse the result."""
+    if not user.is_authenticated:
+        return ANONYMOUS_ROLE
+    role = getattr(user, '_role_cache', None)
+    if role is None:
+        profiles = namespace(user.pk)
+        key = await profiles.akey('profile')
+        profile = await profiles.cache.aget(key)
+        if profile is None:
+            is_admin = await UserProfile.objects.filter(user_id=user.pk).values_list('is_admin', flat=True).afirst()
+            profile = (is_admin is not None, bool(is_admin))
+            await profiles.cache.aset(key, profile, CACHE_TIMEOUT)
+        has_profile, profile_admin = profile
+        role = UserRole(has_profile=has_profile, is_admin=profile_admin or user.is_superuser)
+        user._role_cache = role
+    return role
+
+
+def invalidate(user_id) -> None:
+    namespace(user_id).bump()
@@ -0,0 +1,23 @@
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import roles, throttling
+from .models import UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_user_role(sender, instance, **kwargs):
+    roles.invalidate(instance.user_id)
+
+
+@receiver(user_login_failed)
+def count_failed_login(sender, credentials, request=None, **kwargs):
+    if request is not None:
+        throttling.record_failure(request, credentials.get('username') or '')
+
+
+@receiver(user_logged_in)
+def clear_failed_logins(sender, request, user, **kwargs):
+    throttling.reset(user)
@@ -1,27 +1,15 @@
 from django import template
 
+from accounts.roles import get_user_role
+
 register = template.Library()
 
 @register.filter
 def is_admin(user):
     """Check if user is admin, with fallback for missing UserProfile"""
-    if not user.is_authenticated:
-        return False
-    
-    try:
-        return user.profile.is_admin or user.is_superuser
-    except:
-        # Fallback to superuser if UserProfile doesn't exist
-        return user.is_superuser
+    return get_user_role(user).is_admin
 
 @register.filter
 def has_profile(user):
     """Check if user has a profile"""
-    if not user.is_authenticated:
-        return False
-    
-    try:
-        user.profile
-        return True
-    except:
-        return False
+    return get_user_role(user).has_profile
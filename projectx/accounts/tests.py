@@ -0,0 +1,134 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from orders.models import Cart
+from products.models import Category, Product
+from projectx.testing import CacheIsolationMixin, QueryBudgetTestCase
+
+from . import throttling
+from .backends import EmailOrUsernameBackend
+from .models import LoginFailureCount
+
+
+class LoginThrottlingTests(CacheIsolationMixin, TestCase):
+    def setUp(self):
+        self.request = RequestFactory().post('/', REMOTE_ADDR='203.0.113.7')
+        self.now = timezone.now()
+
+    def fail(self, times=1, identifier='alice', at=None):
+        with mock.patch('accounts.throttling.timezone.now', return_value=at or self.now):
+            for _ in range(times):
+                throttling.record_failure(self.request, identifier)
+
+    def blocked(self, identifier='alice', at=None):
+        with mock.patch('accounts.throttling.timezone.now', return_value=at or self.now):
+            return throttling.is_blocked(self.request, identifier)
+
+    def test_blocks_at_the_account_limit(self):
+        self.fail(settings.LOGIN_FAILURES_PER_ACCOUNT - 1)
+        self.assertFalse(self.blocked())
+        self.fail()
+        self.assertTrue(self.blocked())
+        self.assertFalse(self.blocked('bob'))
+
+    def test_blocks_at_the_ip_limit(self):
+        for i in range(settings.LOGIN_FAILURES_PER_IP):
+            self.fail(identifier=f'user{i}')
+        self.assertTrue(self.blocked('someone-else'))
+
+    def test_window_is_fixed_from_the_first_failure(self):
+        window = timedelta(seconds=settings.LOGIN_THROTTLE_WINDOW)
+        self.fail()
+        # Later failures count in the same window without extending it.
+        almost_over = self.now + window - timedelta(seconds=1)
+        self.fail(settings.LOGIN_FAILURES_PER_ACCOUNT - 1, at=almost_over)
+        self.assertTrue(self.blocked(at=almost_over))
+        over = self.now + window + timedelta(seconds=1)
+        self.assertFalse(self.blocked(at=over))
+        # The next failure starts a new window with a count of one.
+        self.fail(at=over)
+        self.assertEqual(LoginFailureCount.objects.get(key=throttling._account_key('alice')).count, 1)
+
+    def test_identifier_is_case_insensitive(self):
+        self.fail(settings.LOGIN_FAILURES_PER_ACCOUNT, identifier='Alice ')
+        self.assertTrue(self.blocked('alice'))
+
+    def test_successful_login_clears_the_account_count(self):
+        user = User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+        url = reverse('accounts:login')
+        for _ in range(settings.LOGIN_FAILURES_PER_ACCOUNT - 1):
+            self.client.post(url, {'username': 'alice', 'password': 'wrong'})
+        self.client.post(url, {'username': 'alice', 'password': 'correct-horse'})
+        self.assertFalse(LoginFailureCount.objects.filter(key=throttling._user_key(user)).exists())
+
+    def test_username_and_email_share_the_account_count(self):
+        User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+        url = reverse('accounts:login')
+        for i in range(settings.LOGIN_FAILURES_PER_ACCOUNT):
+            self.client.post(url, {'username': ('alice', 'Alice@example.com')[i % 2], 'password': 'wrong'})
+        response = self.client.post(url, {'username': 'alice', 'password': 'correct-horse'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_blocked_attempts_are_refused_without_hashing(self):
+        User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+        url = reverse('accounts:login')
+        for _ in range(settings.LOGIN_FAILURES_PER_ACCOUNT):
+            self.client.post(url, {'username': 'alice', 'password': 'wrong'})
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.encode') as encode:
+            response = self.client.post(url, {'username': 'alice', 'password': 'correct-horse'})
+        self.assertEqual(response.status_code, 429)
+        encode.assert_not_called()
+
+
+class EmailOrUsernameBackendTests(TestCase):
+    def test_username_match_wins_over_accounts_with_that_email(self):
+        User.objects.create_user('bob', 'carol', 'pw-bob')
+        User.objects.create_user('dave', 'carol', 'pw-dave')
+        carol = User.objects.create_user('carol', 'carol@example.com', 'pw-carol')
+        self.assertEqual(EmailOrUsernameBackend().get_account('carol'), carol)
+
+
+class AccountsQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+
+    def test_login_page(self):
+        self.assertWithinQueryBudget('accounts:login')
+
+    def test_login_merging_an_anonymous_cart(self):
+        category = Category.objects.create(slug='men', name='Men')
+        for i in range(3):
+            product = Product.objects.create(category=category, name=f'Shirt {i}', slug=f'shirt-{i}', price=Decimal('10.00'))
+            self.client.get(reverse('products:add_to_cart', args=[product.slug]))
+        response = self.assertWithinQueryBudget(
+            'accounts:login', method='post', data={'username': 'alice', 'password': 'correct-horse'},
+        )
+        self.assertRedirects(response, reverse('products:home'), fetch_redirect_response=False)
+        self.assertEqual(Cart.objects.get(user=self.user).item_count, 3)
+
+    def test_login_by_email(self):
+        self.assertWithinQueryBudget(
+            'accounts:login', method='post', data={'username': 'ALICE@example.com', 'password': 'correct-horse'},
+        )
+        self.assertIn('_auth_user_id', self.client.session)
+
+    def test_failed_login(self):
+        self.assertWithinQueryBudget('accounts:login', method='post', data={'username': 'alice', 'password': 'wrong'})
+
+    def test_register(self):
+        self.assertWithinQueryBudget('accounts:register')
+        response = self.assertWithinQueryBudget('accounts:register', method='post', data={
+            'username': 'bob', 'email': 'bob@example.com', 'password1': 'Tr1cky-passw0rd', 'password2': 'Tr1cky-passw0rd',
+        })
+        self.assertRedirects(response, reverse('accounts:login'), fetch_redirect_response=False)
+
+    def test_logout(self):
+        self.client.force_login(self.user)
+        self.assertWithinQueryBudget('accounts:logout')
@@ -0,0 +1,99 @@
+"""
+Login attempt limiting.
+
+Failed logins are counted per client IP and per account, in fixed windows of
+``LOGIN_THROTTLE_WINDOW`` seconds that start at the first failure. Once
+either count reaches its limit, accounts.backends refuses further attempts
+without hashing the password until the window ends, so credential stuffing
+can't keep the CPUs busy with PBKDF2. A successful login clears the
+account's count (see accounts.signals).
+
+accounts.backends looks the account up before checking the limits and
+passes it to ``remember_account``, so the username and the email address of
+one account share a count. Identifiers that match no account are counted by
+the identifier itself (lower-cased).
+
+The counts are LoginFailureCount rows, not cache entries: the cache
+backends in use can't increment atomically, so parallel attempts would
+lose increments and get more guesses than the limits allow. A failure is
+one conditional ``UPDATE ... SET count = count + 1`` while its window is
+open. When the window has ended, the expired rows are deleted and a new one
+is inserted; if a parallel attempt inserted it first, the UPDATE is retried.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LoginFailureCount
+
+
+def _account_key(identifier: str) -> str:
+    digest = hashlib.md5(identifier.strip().lower().encode()).hexdigest()
+    return f'account:{digest}'
+
+
+def _user_key(user) -> str:
+    return f'user:{user.pk}'
+
+
+def _ip_key(request) -> str:
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def remember_account(request, identifier: str, user) -> None:
+    """Record which account ``identifier`` resolved to for the rest of this request (None: no match)."""
+    request._login_account = (identifier.strip().lower(), user)
+
+
+def _key_for(request, identifier: str) -> str:
+    remembered, user = getattr(request, '_login_account', (None, None))
+    if user is not None and remembered == identifier.strip().lower():
+        return _user_key(user)
+    return _account_key(identifier)
+
+
+def _window_start():
+    """Windows that started before this have ended."""
+    return timezone.now() - timedelta(seconds=settings.LOGIN_THROTTLE_WINDOW)
+
+
+def is_blocked(request, identifier: str) -> bool:
+    ip_key, account_key = _ip_key(request), _key_for(request, identifier)
+    counts = dict(
+        LoginFailureCount.objects.filter(key__in=[ip_key, account_key], window_start__gt=_window_start())
+        .values_list('key', 'count')
+    )
+    return (
+        counts.get(ip_key, 0) >= settings.LOGIN_FAILURES_PER_IP
+        or counts.get(account_key, 0) >= settings.LOGIN_FAILURES_PER_ACCOUNT
+    )
+
+
+def _increment(key) -> None:
+    while True:
+        current = LoginFailureCount.objects.filter(key=key, window_start__gt=_window_start())
+        if current.update(count=F('count') + 1):
+            return
+        # No open window: start one. Expired rows of other keys go too, so the table stays small.
+        LoginFailureCount.objects.filter(window_start__lte=_window_start()).delete()
+        try:
+            with transaction.atomic():
+                LoginFailureCount.objects.create(key=key, count=1, window_start=timezone.now())
+            return
+        except IntegrityError:
+            # A parallel attempt started the window; count this one in it.
+            continue
+
+
+def record_failure(request, identifier: str) -> None:
+    _increment(_ip_key(request))
+    if identifier:
+        _increment(_key_for(request, identifier))
+
+
+def reset(user) -> None:
+    LoginFailureCount.objects.filter(key=_user_key(user)).delete()
@@ -9,4 +9,15 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
 ]
 
-
+# Max queries per request (see projectx.instrumentation)
+QUERY_BUDGETS = {
+    # A login that merges an anonymous cart: user, throttle check, session (exists,
+    # BEGIN, INSERT), last_login, BEGIN and DELETE of the failure counts, the cart
+    # (SELECT, BEGIN, INSERT), the merge (BEGIN, cart lock, lines, prices, upsert,
+    # totals UPDATE) and the session save (BEGIN, UPDATE).
+    # A first failed attempt is 13: two throttle checks and a new window per key.
+    'login': 19,
+    # Two username checks, BEGIN, user, profile (lookup, then INSERT in a savepoint), welcome email
+    'register': 9,
+    'logout': 3,
+}
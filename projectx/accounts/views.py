@@ -1,12 +1,12 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from notifications import outbox
+from . import throttling
 from .forms import UserRegistrationForm, AdminRegistrationForm
 from .models import UserProfile
 
@@ -20,18 +20,15 @@ def login_view(request):
         username_or_email = request.POST.get('username')
         password = request.POST.get('password')
 
+        # accounts.backends accepts a username or an email address
         user = authenticate(request, username=username_or_email, password=password)
-        if not user:
-            try:
-                user_obj = User.objects.get(email=username_or_email)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                user = None
-
         if user:
             login(request, user)
             messages.success(request, 'Logged in successfully')
             return redirect('products:home')
+        if throttling.is_blocked(request, username_or_email or ''):
+            messages.error(request, 'Too many failed login attempts. Please try again later.')
+            return render(request, 'accounts/login.html', status=429)
         messages.error(request, 'Invalid credentials')
 
     return render(request, 'accounts/login.html')
@@ -56,22 +53,12 @@ def register_view(request):
             form = UserRegistrationForm(request.POST)
         
         if form.is_valid():
-            user = form.save()
+            with transaction.atomic():
+                user = form.save()
+                # Welcome email for regular users, sent later by the outbox worker (drain_outbox)
+                if not user_type == 'admin' and user.email:
+                    outbox.enqueue_template('welcome', {'user': user}, user.email, subject='Welcome to ShopX')
             messages.success(request, 'Registration successful! Please log in.')
-            
-            # Send welcome email for regular users
-            if not user_type == 'admin':
-                try:
-                    send_mail(
-                        subject='Welcome to ShopX',
-                        message='Hi, your registration at ShopX was successful. Happy shopping!',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[user.email],
-                        fail_silently=True,
-                    )
-                except Exception:
-                    pass  # Silently handle email sending failures
-            
             return redirect('accounts:login')
         else:
             for field, errors in form.errors.items():
@@ -0,0 +1,77 @@
+from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from . import reports
+from .models import DailyCategorySales, DailyProductSales, DailyRevenue, RollupCheckpoint
+
+REPORT_PERIODS = (7, 30, 90, 365)
+
+
+class RollupAdmin(admin.ModelAdmin):
+    """Read-only: analytics.rollup maintains these (rollup_sales --rebuild recomputes them)."""
+    date_hierarchy = "day"
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(RollupAdmin):
+    list_display = ("day", "orders", "units", "revenue")
+    change_list_template = "admin/analytics/dailyrevenue/change_list.html"
+
+    def get_urls(self):
+        report = path("report/", self.admin_site.admin_view(self.report_view), name="analytics_sales_report")
+        return [report, *super().get_urls()]
+
+    def report_view(self, request):
+        try:
+            days = int(request.GET.get("days", 30))
+        except ValueError:
+            days = 30
+        days = days if days in REPORT_PERIODS else 30
+        start, end = reports.last_days(days)
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Sales, last {days} days",
+            "opts": self.model._meta,
+            "report": reports.sales_report(start, end),
+            "days": days,
+            "periods": REPORT_PERIODS,
+        }
+        return TemplateResponse(request, "admin/analytics/sales_report.html", context)
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(RollupAdmin):
+    list_display = ("day", "product", "units", "revenue")
+    list_select_related = ["product"]
+    ordering = ("-day", "-revenue")
+    search_fields = ("product__name",)
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(RollupAdmin):
+    list_display = ("day", "category", "units", "revenue")
+    list_select_related = ["category"]
+    list_filter = ("category",)
+    ordering = ("-day", "-revenue")
+
+
+@admin.register(RollupCheckpoint)
+class RollupCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("name", "paid_at", "order_id", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,40 @@
+import time
+
+from analytics import rollup, tasks
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll settled paid orders up into the daily sales tables read by sales_report. "
+        "With --schedule, queue the self-rescheduling analytics.rollup_sales job instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Orders per transaction (default ANALYTICS_ROLLUP_BATCH_SIZE)")
+        parser.add_argument('--rebuild', action='store_true', help="Empty the rollup tables and roll every order up again")
+        parser.add_argument('--schedule', action='store_true', help="Queue the rollup job for the next interval and exit")
+        parser.add_argument('--loop', action='store_true', help="Keep rolling up until interrupted")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between rollups with --loop")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = tasks.schedule()
+            self.stdout.write(f"Queued job {job.pk}" if job else "The next rollup is already queued")
+            return
+        if options['rebuild']:
+            started = time.perf_counter()
+            count = rollup.rebuild(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt the rollups from {count} orders in {time.perf_counter() - started:.2f}s"))
+            return
+        while True:
+            started = time.perf_counter()
+            count = rollup.roll_up(options['batch_size'])
+            if count or not options['loop']:
+                self.stdout.write(f"rolled_up={count} in {time.perf_counter() - started:.2f}s")
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
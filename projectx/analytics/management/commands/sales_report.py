@@ -0,0 +1,47 @@
+from datetime import date
+
+from analytics import reports
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Print revenue per day, top products and category shares for a date range. "
+        "Reads only the rollup tables (run rollup_sales first), never the orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Days up to and including today (default 30)")
+        parser.add_argument('--start', type=date.fromisoformat, help="First day, YYYY-MM-DD (overrides --days)")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day, YYYY-MM-DD (default today)")
+        parser.add_argument('--top', type=int, default=10, help="Products to list (default 10)")
+
+    def handle(self, *args, **options):
+        start, end = reports.last_days(options['days'])
+        start = options['start'] or start
+        end = options['end'] or end
+        if start > end:
+            raise CommandError("--start is after --end")
+        report = reports.sales_report(start, end, top=options['top'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Sales {start} to {end}"))
+        self.stdout.write(
+            f"orders={report.orders} units={report.units} revenue={report.revenue} "
+            f"average_order={report.average_order}"
+        )
+        self.stdout.write(f"Rolled up to: {report.rolled_up_to or 'nothing yet'}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nRevenue by day"))
+        self.stdout.write(f"{'day':<12} {'orders':>8} {'units':>8} {'revenue':>14}")
+        for row in report.days:
+            self.stdout.write(f"{row.day.isoformat():<12} {row.orders:>8} {row.units:>8} {row.revenue:>14}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nTop {options['top']} products"))
+        self.stdout.write(f"{'product':<40} {'units':>8} {'revenue':>14}")
+        for row in report.top_products:
+            self.stdout.write(f"{row['name'][:40]:<40} {row['units']:>8} {row['revenue']:>14}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nCategories"))
+        self.stdout.write(f"{'category':<20} {'units':>8} {'revenue':>14} {'share':>7}")
+        for row in report.categories:
+            self.stdout.write(f"{row['name'][:20]:<20} {row['units']:>8} {row['revenue']:>14} {row['share']:>6.1f}%")
@@ -0,0 +1,60 @@
+from django.db import models
+from products.models import Category, Product
+
+
+class DailyRevenue(models.Model):
+    """Paid orders per day (in TIME_ZONE), maintained by analytics.rollup."""
+    day = models.DateField(primary_key=True)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        verbose_name_plural = "daily revenue"
+
+    def __str__(self) -> str:
+        return f"{self.day}: {self.orders} orders, {self.revenue}"
+
+
+class DailyProductSales(models.Model):
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="+")
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily product sales"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "product"], name="uniq_product_sales_per_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.product_id}: {self.units} units"
+
+
+class DailyCategorySales(models.Model):
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name="+")
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily category sales"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "category"], name="uniq_category_sales_per_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.category_id}: {self.units} units"
+
+
+class RollupCheckpoint(models.Model):
+    """The last order a rollup has counted: orders are rolled up in (paid_at, id) order."""
+    name = models.CharField(max_length=50, primary_key=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    order_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} at {self.paid_at} (order {self.order_id})"
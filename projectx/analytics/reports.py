@@ -0,0 +1,82 @@
+"""
+Sales reports, read from the rollup tables only (see analytics.rollup).
+
+A report over any date range costs a handful of queries on tables with one
+row per day, per (day, product) and per (day, category). It never touches
+Order or OrderItem. The only other reads are the names of the top products
+and of the categories, by primary key.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+from products.models import Category, Product
+
+from .models import DailyCategorySales, DailyProductSales, DailyRevenue, RollupCheckpoint
+from .rollup import CHECKPOINT
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+
+@dataclass
+class SalesReport:
+    start: date
+    end: date
+    days: list = field(default_factory=list)
+    top_products: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    orders: int = 0
+    units: int = 0
+    revenue: Decimal = ZERO
+    # paid_at of the last order rolled up; later orders aren't in the report yet
+    rolled_up_to: object = None
+
+    @property
+    def average_order(self) -> Decimal:
+        return (self.revenue / self.orders).quantize(CENT) if self.orders else ZERO
+
+
+def last_days(days: int) -> tuple[date, date]:
+    end = timezone.localdate()
+    return end - timedelta(days=days - 1), end
+
+
+def sales_report(start: date, end: date, top: int = 10) -> SalesReport:
+    """Daily revenue, the ``top`` products by revenue and each category's share, for ``start``..``end``."""
+    report = SalesReport(start=start, end=end)
+    report.days = list(DailyRevenue.objects.filter(day__range=(start, end)).order_by('day'))
+    for row in report.days:
+        report.orders += row.orders
+        report.units += row.units
+        report.revenue += row.revenue
+
+    products = list(
+        DailyProductSales.objects.filter(day__range=(start, end)).values('product_id')
+        .annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('-revenue', 'product_id')[:top]
+    )
+    names = Product.objects.only('name').in_bulk([row['product_id'] for row in products])
+    for row in products:
+        product = names.get(row['product_id'])
+        row['name'] = product.name if product else f"#{row['product_id']}"
+        row['revenue'] = row['revenue'].quantize(CENT)
+    report.top_products = products
+
+    categories = list(
+        DailyCategorySales.objects.filter(day__range=(start, end)).values('category_id')
+        .annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('-revenue', 'category_id')
+    )
+    names = Category.objects.only('name').in_bulk([row['category_id'] for row in categories])
+    category_revenue = sum((row['revenue'] for row in categories), ZERO)
+    for row in categories:
+        category = names.get(row['category_id'])
+        row['name'] = category.name if category else f"#{row['category_id']}"
+        row['share'] = row['revenue'] * 100 / category_revenue if category_revenue else ZERO
+        row['revenue'] = row['revenue'].quantize(CENT)
+    report.categories = categories
+
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT).first()
+    report.rolled_up_to = checkpoint.paid_at if checkpoint else None
+    return report
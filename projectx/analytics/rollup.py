@@ -0,0 +1,132 @@
+"""
+Sales rollups.
+
+Sales reports read daily aggregate tables (analytics.models) instead of
+Order and OrderItem, so reporting never scans the tables checkout writes
+to. ``roll_up_batch`` adds the next ``batch_size`` paid orders to them in
+one transaction:
+
+- it reads the orders after the checkpoint in (paid_at, id) order, through
+  the partial order_paid_idx index, and then their items with one query;
+- it sums them per day, per (day, product) and per (day, category);
+- it adds the sums to the existing rows with one read and one upsert per
+  table, and moves the checkpoint past the batch's last order.
+
+The checkpoint moves in the same transaction as the sums, so a batch is
+counted once however often it is retried. Only orders paid at least
+``ANALYTICS_SETTLE_SECONDS`` ago are rolled up. Checkout sets paid_at
+before its transaction commits, so a younger order could still show up
+behind the checkpoint and never be counted.
+
+Days are in TIME_ZONE, and a product counts towards the category it has
+when it is rolled up. Changes to orders after they were rolled up (an order
+cancelled in the admin, say) are not subtracted. ``rebuild`` recomputes the
+tables from the orders (``manage.py rollup_sales --rebuild``).
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from orders.models import Order, OrderItem
+
+from .models import DailyCategorySales, DailyProductSales, DailyRevenue, RollupCheckpoint
+
+CHECKPOINT = 'sales'
+ZERO = Decimal('0')
+
+
+@dataclass
+class BatchResult:
+    orders: int = 0
+    last_order_id: int | None = None
+
+
+def batch_size() -> int:
+    return getattr(settings, 'ANALYTICS_ROLLUP_BATCH_SIZE', 500)
+
+
+def roll_up_batch(size: int | None = None) -> BatchResult:
+    """Roll the next ``size`` settled paid orders up into the daily tables."""
+    size = size or batch_size()
+    settled_before = timezone.now() - timedelta(seconds=getattr(settings, 'ANALYTICS_SETTLE_SECONDS', 60))
+    with transaction.atomic():
+        checkpoint, _ = RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT)
+        orders = Order.objects.filter(status='paid', paid_at__lt=settled_before)
+        if checkpoint.paid_at is not None:
+            # A range scan of the index from the checkpoint, skipping orders already counted
+            orders = orders.filter(paid_at__gte=checkpoint.paid_at).exclude(
+                paid_at=checkpoint.paid_at, id__lte=checkpoint.order_id,
+            )
+        batch = list(orders.order_by('paid_at', 'id').values_list('id', 'paid_at', 'total_amount')[:size])
+        if not batch:
+            return BatchResult()
+        _add(batch)
+        checkpoint.order_id, checkpoint.paid_at = batch[-1][0], batch[-1][1]
+        checkpoint.save()
+    return BatchResult(orders=len(batch), last_order_id=checkpoint.order_id)
+
+
+def roll_up(size: int | None = None) -> int:
+    """Roll up every settled paid order, one transaction per batch; returns how many were added."""
+    size = size or batch_size()
+    total = 0
+    while True:
+        result = roll_up_batch(size)
+        total += result.orders
+        if result.orders < size:
+            return total
+
+
+def rebuild(size: int | None = None) -> int:
+    """Empty the rollup tables and roll every settled paid order up again."""
+    with transaction.atomic():
+        RollupCheckpoint.objects.select_for_update().filter(name=CHECKPOINT).delete()
+        for model in (DailyRevenue, DailyProductSales, DailyCategorySales):
+            model.objects.all().delete()
+    return roll_up(size)
+
+
+def _add(batch) -> None:
+    revenue = defaultdict(lambda: [0, 0, ZERO])
+    products = defaultdict(lambda: [0, ZERO])
+    categories = defaultdict(lambda: [0, ZERO])
+    day_of = {}
+    for order_id, paid_at, total in batch:
+        day = timezone.localdate(paid_at)
+        day_of[order_id] = day
+        revenue[(day,)][0] += 1
+        revenue[(day,)][2] += total
+    items = OrderItem.objects.filter(order_id__in=day_of).values_list(
+        'order_id', 'product_id', 'product__category_id', 'quantity', 'price',
+    )
+    for order_id, product_id, category_id, quantity, price in items:
+        day = day_of[order_id]
+        amount = price * quantity
+        revenue[(day,)][1] += quantity
+        for sums in (products[(day, product_id)], categories[(day, category_id)]):
+            sums[0] += quantity
+            sums[1] += amount
+    _merge(DailyRevenue, ('day',), ('orders', 'units', 'revenue'), revenue)
+    _merge(DailyProductSales, ('day', 'product_id'), ('units', 'revenue'), products)
+    _merge(DailyCategorySales, ('day', 'category_id'), ('units', 'revenue'), categories)
+
+
+def _merge(model, unique_fields, fields, sums) -> None:
+    """Add ``sums`` ({unique field values: [field values]}) to ``model``'s rows."""
+    if not sums:
+        return
+    lookups = {f'{name}__in': {key[i] for key in sums} for i, name in enumerate(unique_fields)}
+    width = len(unique_fields)
+    # The lookups can match more rows than there are sums; only the matching keys are added.
+    for row in model.objects.filter(**lookups).values_list(*unique_fields, *fields):
+        key = row[:width]
+        if key in sums:
+            sums[key] = [a + b for a, b in zip(sums[key], row[width:])]
+    model.objects.bulk_create(
+        [model(**dict(zip(unique_fields, key)), **dict(zip(fields, values))) for key, values in sums.items()],
+        update_conflicts=True, unique_fields=unique_fields, update_fields=fields, batch_size=500,
+    )
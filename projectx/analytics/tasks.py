@@ -0,0 +1,30 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from jobs.queue import enqueue, register
+
+from . import rollup
+
+JOB = 'analytics.rollup_sales'
+
+
+def schedule(after_order=None):
+    """
+    Queue the next rollup run: straight away to continue after ``after_order``,
+    otherwise at the start of the next ANALYTICS_ROLLUP_INTERVAL slot. Runs are
+    keyed by what they continue from, so overlapping schedulers queue one run.
+    """
+    if after_order is not None:
+        return enqueue(JOB, key=f'{JOB}:after:{after_order}')
+    interval = getattr(settings, 'ANALYTICS_ROLLUP_INTERVAL', 300)
+    slot = int(timezone.now().timestamp() // interval) + 1
+    run_at = datetime.fromtimestamp(slot * interval, tz=dt_timezone.utc)
+    return enqueue(JOB, key=f'{JOB}:{slot}', delay=run_at - timezone.now())
+
+
+@register(JOB)
+def rollup_sales():
+    # One batch per run keeps the job's transaction short; a full batch means more are waiting.
+    result = rollup.roll_up_batch()
+    schedule(after_order=result.last_order_id if result.orders == rollup.batch_size() else None)
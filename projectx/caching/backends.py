@@ -0,0 +1,204 @@
+"""
+Two-tier cache backend.
+
+``TieredCache`` puts a small per-process LRU in front of a shared cache
+that every process sees. The LRU is Django's LocMemCache, which evicts the
+least recently used entries. ``OPTIONS['SHARED']`` names the shared cache's
+alias, a file-based or database cache, so no cache server is needed.
+
+Reads try the local tier first and copy shared hits into it. Misses are
+not cached locally. Writes and deletes go to both tiers, and ``add``,
+``incr`` and ``decr`` are decided by the shared tier alone. An entry stays
+in the local tier for at most ``LOCAL_TIMEOUT`` seconds. That bounds how
+long another process's write or invalidation can go unseen here, so only
+read-mostly data belongs in a tiered cache. Sessions, carts and counters
+stay in the shared cache.
+
+Each process counts local hits, shared hits and misses per tiered cache,
+plus the events ``caching.namespaces.fetch`` records. ``stats()`` returns
+them.
+
+``FileCache`` is the file-based shared tier. Django's FileBasedCache lists
+its whole directory on every write to decide whether to cull. That makes
+writing a page of cards quadratic, so FileCache checks only every
+``CULL_CHECK_INTERVAL`` writes.
+"""
+import threading
+from collections import Counter
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+_MISSING = object()
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def stats() -> dict:
+    """``{cache name: {event: count}}`` for the tiered caches used by this process."""
+    with _counters_lock:
+        return {name: dict(counter) for name, counter in _counters.items()}
+
+
+def reset_stats() -> None:
+    with _counters_lock:
+        for counter in _counters.values():
+            counter.clear()
+
+
+class FileCache(FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_check_interval = params.get('OPTIONS', {}).get('CULL_CHECK_INTERVAL', 100)
+        self._writes = 0
+
+    def _cull(self):
+        self._writes += 1
+        if self._writes % self._cull_check_interval == 0:
+            super()._cull()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.name = location
+        self.shared_alias = options.get('SHARED', 'default')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        # LocMemCache keeps its entries per name, so every thread's instance shares one LRU.
+        self.local = LocMemCache(f'tiered:{location}', {
+            'TIMEOUT': self.local_timeout,
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+                'CULL_FREQUENCY': options.get('LOCAL_CULL_FREQUENCY', 10),
+            },
+        })
+        with _counters_lock:
+            self._counter = _counters.setdefault(location, Counter())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def record(self, event: str, count: int = 1) -> None:
+        with _counters_lock:
+            self._counter[event] += count
+
+    def _local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _local_get(self, key, version):
+        value = self.local.get(key, _MISSING, version)
+        if value is not _MISSING:
+            self.record('local_hits')
+        return value
+
+    def _shared_result(self, key, value, default, version):
+        if value is _MISSING:
+            self.record('misses')
+            return default
+        self.record('shared_hits')
+        self.local.set(key, value, self.local_timeout, version)
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._local_get(key, version)
+        if value is not _MISSING:
+            return value
+        return self._shared_result(key, self.shared.get(key, _MISSING, version), default, version)
+
+    async def aget(self, key, default=None, version=None):
+        # The local tier is in memory, so reading it doesn't block the event loop.
+        value = self._local_get(key, version)
+        if value is not _MISSING:
+            return value
+        return self._shared_result(key, await self.shared.aget(key, _MISSING, version), default, version)
+
+    def _local_hits(self, keys, version):
+        found = self.local.get_many(keys, version)
+        if found:
+            self.record('local_hits', len(found))
+        return found
+
+    def _shared_hits(self, found, missing, shared, version):
+        if shared:
+            self.record('shared_hits', len(shared))
+            self.local.set_many(shared, self.local_timeout, version)
+        if len(missing) > len(shared):
+            self.record('misses', len(missing) - len(shared))
+        return {**found, **shared}
+
+    def get_many(self, keys, version=None):
+        found = self._local_hits(keys, version)
+        missing = [key for key in keys if key not in found]
+        shared = self.shared.get_many(missing, version) if missing else {}
+        return self._shared_hits(found, missing, shared, version)
+
+    async def aget_many(self, keys, version=None):
+        found = self._local_hits(keys, version)
+        missing = [key for key in keys if key not in found]
+        shared = await self.shared.aget_many(missing, version) if missing else {}
+        return self._shared_hits(found, missing, shared, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        self.local.set(key, value, self._local_timeout(timeout), version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        await self.shared.aset(key, value, timeout, version)
+        self.local.set(key, value, self._local_timeout(timeout), version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        self.local.set_many({k: v for k, v in data.items() if k not in failed}, self._local_timeout(timeout), version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.shared.add(key, value, timeout, version):
+            self.local.set(key, value, self._local_timeout(timeout), version)
+            return True
+        # Someone else's value is there; read it from the shared tier next time.
+        self.local.delete(key, version)
+        return False
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if await self.shared.aadd(key, value, timeout, version):
+            self.local.set(key, value, self._local_timeout(timeout), version)
+            return True
+        self.local.delete(key, version)
+        return False
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version)
+        return self.shared.delete(key, version)
+
+    async def adelete(self, key, version=None):
+        self.local.delete(key, version)
+        return await self.shared.adelete(key, version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version)
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version) or self.shared.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        self.local.delete(key, version)
+        return self.shared.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        self.local.delete(key, version)
+        return self.shared.decr(key, delta, version)
+
+    def clear(self):
+        """Clear the shared cache and this process's local tier (other processes keep theirs until it expires)."""
+        self.local.clear()
+        self.shared.clear()
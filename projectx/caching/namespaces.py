@@ -0,0 +1,160 @@
+"""
+Namespaced cache keys with version-bump invalidation, and stampede-safe
+fetches.
+
+A ``Namespace`` puts its current version into every key it makes::
+
+    homepage:v1760781234567890:shelves:localhost
+
+so invalidating everything in it is one write. ``bump()`` stores a new
+version and the old keys are never read again; they expire on their own.
+Versions are microsecond timestamps rather than counters. An evicted
+version key is recreated with a fresh timestamp, so old entries can't come
+back.
+
+``fetch()`` is a get-or-compute that stops every request from recomputing
+a missing or expired entry at once. Entries are stored with the time they
+stay fresh until, and kept ``stale_timeout`` seconds past it. Only the
+request that wins a short lock (``cache.add``) recomputes. The others
+serve the stale value meanwhile or, when there is none, wait up to
+``WAIT_TIMEOUT`` for the winner. The lock is only as atomic as the cache's
+``add``, so with the file backend two requests may now and then compute
+the same entry.
+"""
+import asyncio
+import time
+
+from django.core.cache import caches
+
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+
+def _record(cache, event: str) -> None:
+    record = getattr(cache, 'record', None)
+    if record is not None:
+        record(event)
+
+
+def _entry(value, timeout: int) -> tuple:
+    return time.time() + timeout, value
+
+
+def _lifetime(timeout: int, stale_timeout) -> int:
+    return timeout + (timeout if stale_timeout is None else stale_timeout)
+
+
+def fetch(cache, key: str, compute, timeout: int, stale_timeout=None):
+    """``compute()``'s value cached under ``key`` for ``timeout`` seconds, computed by one request at a time."""
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, LOCK_TIMEOUT):
+        try:
+            _record(cache, 'computes')
+            value = compute()
+            cache.set(key, _entry(value, timeout), _lifetime(timeout, stale_timeout))
+            return value
+        finally:
+            cache.delete(lock)
+    if entry is not None:
+        _record(cache, 'stale_served')
+        return entry[1]
+    _record(cache, 'lock_waits')
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    # The winner is taking too long (or died): compute it ourselves.
+    _record(cache, 'computes')
+    value = compute()
+    cache.set(key, _entry(value, timeout), _lifetime(timeout, stale_timeout))
+    return value
+
+
+async def afetch(cache, key: str, compute, timeout: int, stale_timeout=None):
+    """Async fetch(); ``compute`` is a coroutine function."""
+    entry = await cache.aget(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    lock = f'{key}:lock'
+    if await cache.aadd(lock, 1, LOCK_TIMEOUT):
+        try:
+            _record(cache, 'computes')
+            value = await compute()
+            await cache.aset(key, _entry(value, timeout), _lifetime(timeout, stale_timeout))
+            return value
+        finally:
+            await cache.adelete(lock)
+    if entry is not None:
+        _record(cache, 'stale_served')
+        return entry[1]
+    _record(cache, 'lock_waits')
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(WAIT_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return entry[1]
+    _record(cache, 'computes')
+    value = await compute()
+    await cache.aset(key, _entry(value, timeout), _lifetime(timeout, stale_timeout))
+    return value
+
+
+def _new_version(current=None) -> int:
+    return max(time.time_ns() // 1000, (current or 0) + 1)
+
+
+class Namespace:
+    def __init__(self, name: str, alias: str = 'tiered'):
+        self.name = name
+        self.alias = alias
+        self.version_key = f'{name}:version'
+
+    def __repr__(self):
+        return f'<Namespace {self.name}>'
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def version(self) -> int:
+        version = self.cache.get(self.version_key)
+        if version is None:
+            version = _new_version()
+            if not self.cache.add(self.version_key, version, None):
+                version = self.cache.get(self.version_key, version)
+        return version
+
+    async def aversion(self) -> int:
+        version = await self.cache.aget(self.version_key)
+        if version is None:
+            version = _new_version()
+            if not await self.cache.aadd(self.version_key, version, None):
+                version = await self.cache.aget(self.version_key, version)
+        return version
+
+    def bump(self) -> int:
+        """Invalidate every key of the namespace."""
+        version = _new_version(self.cache.get(self.version_key))
+        self.cache.set(self.version_key, version, None)
+        return version
+
+    def key(self, *parts, version: int | None = None) -> str:
+        version = self.version() if version is None else version
+        return ':'.join([self.name, f'v{version}', *map(str, parts)])
+
+    async def akey(self, *parts) -> str:
+        return self.key(*parts, version=await self.aversion())
+
+    def fetch(self, parts: tuple, compute, timeout: int, stale_timeout=None, version: int | None = None):
+        return fetch(self.cache, self.key(*parts, version=version), compute, timeout, stale_timeout)
+
+    async def afetch(self, parts: tuple, compute, timeout: int, stale_timeout=None, version: int | None = None):
+        key = await self.akey(*parts) if version is None else self.key(*parts, version=version)
+        return await afetch(self.cache, key, compute, timeout, stale_timeout)
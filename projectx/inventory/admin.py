@@ -0,0 +1,43 @@
+from django import forms
+from django.contrib import admin, messages
+from .models import Reservation, StockLevel
+from . import stock
+
+
+class StockLevelForm(forms.ModelForm):
+    # on_hand is only ever changed relative to its current value, so a save
+    # can't overwrite sales that happened while the form was open.
+    adjust_by = forms.IntegerField(initial=0, help_text="Units to add (negative to write stock off)")
+
+    class Meta:
+        model = StockLevel
+        fields = ("product",)
+
+
+@admin.register(StockLevel)
+class StockLevelAdmin(admin.ModelAdmin):
+    form = StockLevelForm
+    list_display = ("product", "on_hand", "reserved", "available", "updated_at")
+    list_select_related = ["product"]
+    search_fields = ("product__name", "product__slug")
+    raw_id_fields = ("product",)
+    readonly_fields = ("on_hand", "reserved", "available", "updated_at")
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields + (("product",) if obj else ())
+
+    def save_model(self, request, obj, form, change):
+        delta = form.cleaned_data["adjust_by"]
+        if not change:
+            obj.save()
+        if delta and not stock.adjust(obj.product_id, delta):
+            messages.error(request, "Can't write off stock that is reserved.")
+        obj.refresh_from_db()
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("order", "product", "quantity", "status", "expires_at", "created_at")
+    list_filter = ("status",)
+    raw_id_fields = ("order", "product")
+    readonly_fields = ("order", "product", "quantity", "status", "expires_at", "created_at")
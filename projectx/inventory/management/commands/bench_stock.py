@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.test import override_settings
+from inventory import stock
+from inventory.models import StockLevel
+from jobs.models import Job
+from orders import checkout
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Flash sale: many threads check out the same product until it sells out. Reports checkout "
+        "throughput under contention and verifies that exactly the stock on hand was sold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--stock', type=int, default=200, help="Units on hand when the sale starts")
+        parser.add_argument('--quantity', type=int, default=1, help="Units per checkout")
+        parser.add_argument('--naive', action='store_true', help="Read stock, check it and save it back, for comparison")
+
+    def handle(self, *args, **options):
+        category = Category.objects.order_by('id').first()
+        if category is None:
+            raise CommandError("No categories found; run seed_demo first.")
+        slug = f'bench-stock-{uuid.uuid4().hex[:12]}'
+        product = Product.objects.create(category=category, name=slug, slug=slug, price=Decimal('10.00'))
+        StockLevel.objects.create(product=product, on_hand=options['stock'])
+        threads, quantity = options['threads'], options['quantity']
+        counts = {'sold': 0, 'sold_out': 0, 'retries': 0}
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+        buy = self._naive_checkout if options['naive'] else self._checkout
+
+        def shopper():
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        sold = buy(product, quantity)
+                    except OperationalError:
+                        # SQLite has a single writer; a timed-out lock wait is retried.
+                        with lock:
+                            counts['retries'] += 1
+                        continue
+                    with lock:
+                        counts['sold' if sold else 'sold_out'] += 1
+                    if not sold:
+                        break
+            except Exception as exc:
+                errors.append(repr(exc))
+            finally:
+                connection.close()
+
+        try:
+            # Run the stock commit job inline after each checkout so every sale is settled by the end.
+            with override_settings(JOBS_WORKERS=0):
+                started = time.perf_counter()
+                workers = [threading.Thread(target=shopper) for _ in range(threads)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - started
+
+            level = StockLevel.objects.get(product=product)
+            units_sold = OrderItem.objects.filter(product=product).values_list('quantity', flat=True)
+            units_sold = sum(units_sold)
+            expected = options['stock'] // quantity * quantity
+            self.stdout.write(
+                f"{threads} threads sold {counts['sold']} orders ({units_sold} units) in {elapsed:.2f}s: "
+                f"{counts['sold'] / elapsed:.0f} checkouts/s, {counts['retries']} lock retries"
+            )
+            self.stdout.write(f"stock: on_hand={level.on_hand} reserved={level.reserved} (started with {options['stock']})")
+            for error in errors[:5]:
+                self.stdout.write(self.style.WARNING(error))
+            if units_sold > options['stock']:
+                raise CommandError(f"Oversold by {units_sold - options['stock']} units")
+            if units_sold != expected or level.on_hand != options['stock'] - units_sold or level.reserved:
+                raise CommandError(f"Stock doesn't add up: expected {expected} units sold")
+            self.stdout.write(self.style.SUCCESS("Sold exactly the stock on hand"))
+        finally:
+            orders = Order.objects.filter(items__product=product)
+            Job.objects.filter(key__in=[f'commit-stock:{pk}' for pk in orders.values_list('pk', flat=True)]).delete()
+            orders.delete()
+            product.delete()
+
+    def _checkout(self, product, quantity) -> bool:
+        try:
+            checkout.place_order(None, [(product, quantity, product.price)], mark_paid=True)
+        except stock.OutOfStock:
+            return False
+        return True
+
+    def _naive_checkout(self, product, quantity) -> bool:
+        level = StockLevel.objects.get(product=product)
+        if level.available < quantity:
+            return False
+        with transaction.atomic():
+            order = Order.objects.create(total_amount=product.price * quantity, status='paid')
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, price=product.price)
+            level.on_hand -= quantity
+            level.save(update_fields=['on_hand'])
+        return True
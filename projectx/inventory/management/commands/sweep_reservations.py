@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from inventory import stock
+
+
+class Command(BaseCommand):
+    help = "Release expired stock reservations of unpaid orders and cancel those orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Reservations released per transaction")
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping until interrupted")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between sweeps with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            released, cancelled = stock.sweep_expired(batch_size=options['batch_size'])
+            if released or not options['loop']:
+                self.stdout.write(
+                    f"released={released} cancelled_orders={cancelled} in {time.perf_counter() - started:.2f}s"
+                )
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
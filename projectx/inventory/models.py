@@ -0,0 +1,54 @@
+from django.db import models
+from orders.models import Order
+from products.models import Product
+
+
+class StockLevel(models.Model):
+    """Stock of one product. Products without a row are not stock-tracked."""
+
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="stock")
+    on_hand = models.PositiveIntegerField(default=0)
+    # Held by active reservations; on_hand - reserved can still be sold
+    reserved = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(reserved__lte=models.F("on_hand")), name="stock_reserved_lte_on_hand"),
+        ]
+
+    @property
+    def available(self) -> int:
+        return self.on_hand - self.reserved
+
+    def __str__(self) -> str:
+        return f"{self.product} ({self.available} available)"
+
+
+class Reservation(models.Model):
+    """Stock held for an order until it is paid (committed) or the hold expires (released)."""
+
+    ACTIVE = "active"
+    COMMITTED = "committed"
+    RELEASED = "released"
+    STATUS_CHOICES = (
+        (ACTIVE, "Active"),
+        (COMMITTED, "Committed"),
+        (RELEASED, "Released"),
+    )
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="reservations")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The sweeper's scan: active holds past their expiry
+            models.Index(fields=["expires_at"], condition=models.Q(status="active"), name="reservation_expiry_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id} for order #{self.order_id} ({self.status})"
@@ -0,0 +1,151 @@
+"""
+Stock levels and reservations.
+
+Every change is one conditional UPDATE of the StockLevel row, e.g.::
+
+    UPDATE inventory_stocklevel SET reserved = reserved + 2
+    WHERE product_id = 7 AND on_hand >= reserved + 2
+
+so two checkouts racing for the last item can't both win, and nothing is
+read, changed in Python and saved back. Checkout reserves an order's stock
+in its own transaction (``reserve``). It does that last, in product id
+order, so the hot rows stay locked only until the commit and concurrent
+checkouts can't deadlock. A paid order's reservations are turned into a
+sale by a job (``commit``), which lowers on_hand and reserved together.
+Reservations of orders that are still unpaid after ``STOCK_RESERVATION_TTL``
+seconds are released in batches by ``sweep_expired`` (the
+sweep_reservations command), and their orders are cancelled.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from orders.models import Order
+
+from .models import Reservation, StockLevel
+
+
+class OutOfStock(Exception):
+    def __init__(self, product, available: int):
+        self.product = product
+        self.available = available
+        super().__init__(
+            f'Only {available} of "{product}" left in stock' if available > 0 else f'"{product}" is out of stock'
+        )
+
+
+def available(product_ids) -> dict:
+    """``{product_id: available}`` for the tracked products among ``product_ids``."""
+    return {
+        row['product_id']: row['on_hand'] - row['reserved']
+        for row in StockLevel.objects.filter(product_id__in=product_ids).values('product_id', 'on_hand', 'reserved')
+    }
+
+
+def reserve(order, lines, ttl=None) -> list:
+    """Hold stock for ``(product, quantity, unit_price)`` lines of ``order``; raises OutOfStock.
+
+    Untracked products are skipped. On OutOfStock nothing stays reserved.
+    """
+    quantities = Counter()
+    products = {}
+    for product, quantity, _ in lines:
+        quantities[product.pk] += quantity
+        products[product.pk] = product
+    tracked = sorted(StockLevel.objects.filter(product_id__in=quantities).values_list('product_id', flat=True))
+    if not tracked:
+        # Nothing to hold: don't open a savepoint in the caller's transaction for it.
+        return []
+    expires_at = timezone.now() + timedelta(seconds=ttl or settings.STOCK_RESERVATION_TTL)
+    held = []
+    with transaction.atomic():
+        for product_id in tracked:
+            quantity = quantities[product_id]
+            stock = StockLevel.objects.filter(product_id=product_id)
+            if not stock.filter(on_hand__gte=F('reserved') + quantity).update(reserved=F('reserved') + quantity):
+                level = stock.values('on_hand', 'reserved').get()
+                raise OutOfStock(products[product_id], level['on_hand'] - level['reserved'])
+            held.append(Reservation(order=order, product_id=product_id, quantity=quantity, expires_at=expires_at))
+        return Reservation.objects.bulk_create(held)
+
+
+def _settle(rows, status, sold: bool) -> int:
+    """Mark ``(id, product_id, quantity)`` reservation rows ``status`` and release (or sell) their stock."""
+    if not rows:
+        return 0
+    Reservation.objects.filter(id__in=[row[0] for row in rows]).update(status=status)
+    quantities = Counter()
+    for _, product_id, quantity in rows:
+        quantities[product_id] += quantity
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        changes = {'reserved': F('reserved') - quantity}
+        if sold:
+            changes['on_hand'] = F('on_hand') - quantity
+        StockLevel.objects.filter(product_id=product_id).update(**changes)
+    return len(rows)
+
+
+def _active(order_id):
+    return Reservation.objects.filter(order_id=order_id, status=Reservation.ACTIVE)
+
+
+def commit(order_id) -> int:
+    """Turn an order's active reservations into sold stock; safe to call again."""
+    with transaction.atomic():
+        rows = list(_active(order_id).select_for_update().values_list('id', 'product_id', 'quantity'))
+        return _settle(rows, Reservation.COMMITTED, sold=True)
+
+
+def release(order_id) -> int:
+    """Give an order's reserved stock back, e.g. when it is cancelled."""
+    with transaction.atomic():
+        rows = list(_active(order_id).select_for_update().values_list('id', 'product_id', 'quantity'))
+        return _settle(rows, Reservation.RELEASED, sold=False)
+
+
+def sweep_expired(batch_size: int = 500, max_batches=None) -> tuple:
+    """Release expired reservations of unpaid orders, one batch per transaction.
+
+    Returns ``(reservations released, orders cancelled)``.
+    """
+    released = cancelled = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            rows = list(
+                Reservation.objects.filter(status=Reservation.ACTIVE, expires_at__lt=timezone.now())
+                .exclude(order__status='paid')
+                .order_by('expires_at')
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', 'product_id', 'quantity', 'order_id')[:batch_size]
+            )
+            if not rows:
+                break
+            released += _settle([row[:3] for row in rows], Reservation.RELEASED, sold=False)
+            cancelled += Order.objects.filter(id__in={row[3] for row in rows}, status='pending').update(
+                status='cancelled'
+            )
+        batches += 1
+    return released, cancelled
+
+
+def adjust(product_id, delta: int) -> bool:
+    """Add ``delta`` to on_hand (negative to write stock off), starting to track the product if needed.
+
+    A write-off never takes on_hand below what is reserved; returns False if it would.
+    """
+    stock = StockLevel.objects.filter(product_id=product_id)
+    if delta < 0:
+        return bool(stock.filter(on_hand__gte=F('reserved') - delta).update(on_hand=F('on_hand') + delta))
+    if stock.update(on_hand=F('on_hand') + delta):
+        return True
+    try:
+        with transaction.atomic():
+            StockLevel.objects.create(product_id=product_id, on_hand=delta)
+    except IntegrityError:
+        # Someone else started tracking it first; add on top of theirs.
+        stock.update(on_hand=F('on_hand') + delta)
+    return True
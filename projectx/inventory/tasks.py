@@ -0,0 +1,8 @@
+from jobs.queue import register
+
+from . import stock
+
+
+@register('inventory.commit_order')
+def commit_order(order_id):
+    stock.commit(order_id)
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "key", "status", "attempts", "run_after", "finished_at", "created_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "key")
+    readonly_fields = ("claimed_by", "claimed_at", "created_at", "finished_at", "last_error")
+    actions = ("retry_now",)
+
+    @admin.action(description="Retry selected jobs now")
+    def retry_now(self, request, queryset):
+        # Running jobs are left alone: a worker is executing them (stale claims are released by run_pending).
+        updated = queryset.filter(status__in=[Job.FAILED, Job.QUEUED]).update(
+            status=Job.QUEUED, run_after=timezone.now(), attempts=0
+        )
+        self.message_user(request, f"{updated} jobs queued for retry.")
@@ -0,0 +1,80 @@
+"""
+Claiming rows of a work table.
+
+The job queue (jobs.queue) and the email outbox (notifications.outbox) are
+both tables of rows that workers claim, process and then reschedule or
+finish. ``WorkTable`` holds the parts they share. It needs the row's status
+values and the name of its due-time column, plus ``claimed_by`` and
+``claimed_at`` columns:
+
+- ``claim`` picks due rows and marks them claimed with a conditional UPDATE
+  on the status column, so several workers can share a table without
+  processing a row twice;
+- ``release_stale_claims`` hands back rows whose worker died mid-batch;
+- ``backoff`` is the exponentially growing, jittered retry delay.
+"""
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+@dataclass
+class BatchResult:
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.retried + self.failed
+
+    def add(self, other) -> None:
+        self.done += other.done
+        self.retried += other.retried
+        self.failed += other.failed
+
+
+@dataclass(frozen=True)
+class WorkTable:
+    model: type
+    ready: str
+    claimed: str
+    due_field: str
+    backoff_base: timedelta
+    backoff_max: timedelta
+    # A worker that died mid-batch leaves its rows claimed; they are retried after this.
+    claim_timeout: timedelta
+
+    def backoff(self, attempts: int) -> timedelta:
+        # The exponent is capped so a large attempt count can't overflow timedelta.
+        delay = min(self.backoff_max, self.backoff_base * 2 ** min(attempts - 1, 20))
+        # Jitter so a burst of failures doesn't come back as a burst.
+        return delay * random.uniform(0.8, 1.2)
+
+    def release_stale_claims(self) -> int:
+        return self.model.objects.filter(
+            status=self.claimed, claimed_at__lt=timezone.now() - self.claim_timeout,
+        ).update(status=self.ready, claimed_by='')
+
+    def claim_one(self, pk, worker: str) -> bool:
+        return bool(
+            self.model.objects.filter(pk=pk, status=self.ready).update(
+                status=self.claimed, claimed_by=worker, claimed_at=timezone.now(),
+            )
+        )
+
+    def claim(self, batch_size: int, worker: str) -> list:
+        """Claim up to ``batch_size`` due rows for ``worker``, longest due first."""
+        now = timezone.now()
+        due = list(
+            self.model.objects.filter(status=self.ready, **{f'{self.due_field}__lte': now})
+            .order_by(self.due_field).values_list('id', flat=True)[:batch_size]
+        )
+        if not due:
+            return []
+        self.model.objects.filter(id__in=due, status=self.ready).update(
+            status=self.claimed, claimed_by=worker, claimed_at=now,
+        )
+        return list(self.model.objects.filter(id__in=due, status=self.claimed, claimed_by=worker))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Run due background jobs on a thread pool; with --loop, keep polling as a worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Threads running jobs")
+        parser.add_argument('--batch-size', type=int, help="Jobs claimed per batch (default JOBS_BATCH_SIZE)")
+        parser.add_argument('--loop', action='store_true', help="Keep running jobs until interrupted")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            result = queue.run_pending(batch_size=options['batch_size'], workers=options['workers'])
+            purged = queue.purge_finished()
+            if result.processed or purged or not options['loop']:
+                self.stdout.write(
+                    f"done={result.done} retried={result.retried} failed={result.failed} purged={purged} "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
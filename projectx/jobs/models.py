@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """One queued call of a registered job function (see jobs.queue)."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # Optional dedup key, e.g. "clear-cart:42"; a second enqueue with the same key is a no-op
+    key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    claimed_by = models.CharField(max_length=64, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's poll: due queued jobs, oldest first
+            models.Index(fields=["run_after"], condition=models.Q(status="queued"), name="job_due_idx"),
+            models.Index(fields=["claimed_at"], condition=models.Q(status="running"), name="job_claimed_idx"),
+            models.Index(fields=["finished_at"], condition=models.Q(status="done"), name="job_done_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk} ({self.status})"
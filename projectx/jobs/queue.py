@@ -0,0 +1,163 @@
+"""
+Database-backed job queue for work that doesn't have to finish before the
+response goes out.
+
+Job functions are registered by name with ``@register('app.name')`` in an
+app's ``tasks.py`` and take JSON-serializable keyword arguments. ``enqueue()``
+inserts a Job row in the caller's transaction, so a job exists if and only if
+the change that needs it was committed. An optional ``key`` makes enqueueing
+idempotent. A job runs at least once, inside its own transaction, so job
+functions must be safe to run again after a failure.
+
+When the transaction commits, the job is handed to an in-process thread pool
+of ``JOBS_WORKERS`` threads. With 0 it runs right after the commit, in the
+calling thread. Anything the pool didn't finish (a crashed process, a failure
+waiting out its backoff) is picked up by the ``run_jobs`` command. It claims
+due jobs with a conditional UPDATE, so several workers can share the table.
+Claiming and backoff are in jobs.claims, shared with the email outbox.
+"""
+import logging
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .claims import BatchResult as RunResult, WorkTable
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS = WorkTable(
+    Job, ready=Job.QUEUED, claimed=Job.RUNNING, due_field='run_after',
+    backoff_base=timedelta(seconds=15), backoff_max=timedelta(hours=1), claim_timeout=timedelta(minutes=15),
+)
+
+_registry = {}
+_executor = None
+
+
+def register(name):
+    """Register the decorated function as the job ``name``."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, *, key=None, delay=None) -> Job | None:
+    """Queue ``name(**payload)`` in the current transaction; returns None if ``key`` was queued before."""
+    if name not in _registry:
+        raise ValueError(f'No job registered as {name!r}')
+    job = Job(name=name, payload=payload or {}, key=key, run_after=timezone.now() + (delay or timedelta()))
+    if key is None:
+        job.save()
+    else:
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            return None
+    if delay is None:
+        _dispatch(job.pk)
+    return job
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=getattr(settings, 'JOBS_WORKERS', 2), thread_name_prefix='jobs')
+    return _executor
+
+
+def _dispatch(job_id) -> None:
+    if getattr(settings, 'JOBS_WORKERS', 2) == 0:
+        transaction.on_commit(lambda: run_job(job_id))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job_id))
+
+
+def _run_in_worker(job_id) -> None:
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception('Job %s could not be run', job_id)
+    finally:
+        # Pool threads get their own DB connections; don't leak them.
+        connections.close_all()
+
+
+def run_job(job_id, worker=None) -> str | None:
+    """Claim and run one queued job; returns its new status, or None if someone else has it."""
+    if not JOBS.claim_one(job_id, worker or uuid.uuid4().hex):
+        return None
+    return execute(Job.objects.get(pk=job_id))
+
+
+def execute(job) -> str:
+    """Run a claimed job in a transaction and record the outcome."""
+    max_attempts = getattr(settings, 'JOBS_MAX_ATTEMPTS', 5)
+    job.attempts += 1
+    try:
+        func = _registry.get(job.name)
+        if func is None:
+            raise LookupError(f'No job registered as {job.name!r}')
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()[-2000:]
+        if job.attempts >= max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+            logger.error('Giving up on job %s (%s) after %s attempts', job.pk, job.name, job.attempts)
+        else:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + JOBS.backoff(job.attempts)
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ''
+    job.claimed_by = ''
+    job.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'claimed_by', 'finished_at'])
+    return job.status
+
+
+def _execute_in_thread(job) -> str:
+    try:
+        return execute(job)
+    finally:
+        connections.close_all()
+
+
+def run_pending(batch_size=None, workers=1, max_batches=None, worker=None) -> RunResult:
+    """Run every due job, ``batch_size`` claimed at a time and spread over ``workers`` threads."""
+    batch_size = batch_size or getattr(settings, 'JOBS_BATCH_SIZE', 50)
+    worker = worker or uuid.uuid4().hex
+    result = RunResult()
+    JOBS.release_stale_claims()
+    batches = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='run-jobs') as pool:
+        while max_batches is None or batches < max_batches:
+            jobs = JOBS.claim(batch_size, worker)
+            if not jobs:
+                break
+            batches += 1
+            statuses = map(execute, jobs) if workers == 1 else pool.map(_execute_in_thread, jobs)
+            for status in statuses:
+                if status == Job.DONE:
+                    result.done += 1
+                elif status == Job.FAILED:
+                    result.failed += 1
+                else:
+                    result.retried += 1
+    return result
+
+
+def purge_finished(older_than=None) -> int:
+    """Delete jobs that finished successfully more than ``older_than`` ago (their keys become reusable)."""
+    older_than = older_than or timedelta(days=getattr(settings, 'JOBS_KEEP_DONE_DAYS', 7))
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=timezone.now() - older_than).delete()
+    return deleted
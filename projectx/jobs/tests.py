@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from notifications import outbox
+from notifications.models import OutboundEmail
+
+from . import queue
+from .models import Job
+
+
+@queue.register('jobs.test_fail')
+def fail():
+    raise RuntimeError('boom')
+
+
+@queue.register('jobs.test_noop')
+def noop():
+    pass
+
+
+class WorkTableTests(TestCase):
+    def test_claim_takes_due_rows_once(self):
+        due = Job.objects.create(name='jobs.test_noop')
+        Job.objects.create(name='jobs.test_noop', run_after=timezone.now() + timedelta(hours=1))
+        self.assertEqual(queue.JOBS.claim(10, 'worker-a'), [due])
+        self.assertEqual(queue.JOBS.claim(10, 'worker-b'), [])
+
+    def test_stale_claims_are_released(self):
+        message = OutboundEmail.objects.create(from_email='a@example.com', to=['b@example.com'], subject='s', body='b')
+        self.assertEqual(outbox.OUTBOX.claim(10, 'worker-a'), [message])
+        OutboundEmail.objects.filter(pk=message.pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(outbox.OUTBOX.release_stale_claims(), 1)
+        self.assertEqual(outbox.OUTBOX.claim(10, 'worker-b'), [message])
+
+    def test_backoff_grows_and_is_capped(self):
+        table = queue.JOBS
+        self.assertLess(table.backoff(1), table.backoff(4))
+        self.assertLessEqual(table.backoff(50), table.backoff_max * 1.2)
+
+    def test_failed_job_is_retried_later(self):
+        job = Job.objects.create(name='jobs.test_fail')
+        result = queue.run_pending()
+        self.assertEqual((result.done, result.retried, result.failed), (0, 1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now())
+
+    @override_settings(OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_drain_counts_sent_messages(self):
+        outbox.enqueue('Hello', 'Body', 'b@example.com')
+        result = outbox.drain()
+        self.assertEqual((result.sent, result.processed), (1, 1))
+
+    def test_retry_now_leaves_running_jobs_alone(self):
+        failed = Job.objects.create(name='jobs.test_noop', status=Job.FAILED, attempts=5)
+        running = Job.objects.create(name='jobs.test_noop', status=Job.RUNNING, attempts=1, claimed_by='worker-a')
+        admin = site._registry[Job]
+        with mock.patch.object(admin, 'message_user'):
+            admin.retry_now(None, Job.objects.all())
+        failed.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), (Job.QUEUED, 0))
+        self.assertEqual((running.status, running.attempts), (Job.RUNNING, 1))
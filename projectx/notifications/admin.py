@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "key")
+    readonly_fields = ("claimed_by", "claimed_at", "created_at", "sent_at", "last_error")
+    actions = ("retry_now",)
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+
+    @admin.action(description="Retry selected messages now")
+    def retry_now(self, request, queryset):
+        # Messages being sent are left alone, or the next drain would send them twice.
+        updated = queryset.filter(status__in=[OutboundEmail.FAILED, OutboundEmail.PENDING]).update(
+            status=OutboundEmail.PENDING, next_attempt_at=timezone.now(), attempts=0
+        )
+        self.message_user(request, f"{updated} messages queued for retry.")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from notifications import outbox
+
+
+class Command(BaseCommand):
+    help = "Send due messages from the email outbox; with --loop, keep polling as a worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Messages claimed per batch (default OUTBOX_BATCH_SIZE)")
+        parser.add_argument('--loop', action='store_true', help="Keep draining until interrupted")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            result = outbox.drain(batch_size=options['batch_size'])
+            if result.processed or not options['loop']:
+                self.stdout.write(
+                    f"sent={result.sent} retried={result.retried} failed={result.failed} "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
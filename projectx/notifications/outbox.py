@@ -0,0 +1,146 @@
+"""
+Transactional email outbox.
+
+Views never talk to SMTP. ``enqueue()`` inserts an OutboundEmail row in the
+caller's transaction, so a message exists if and only if the change that
+caused it was committed. ``drain()`` is run by the drain_outbox command in a
+worker process. It claims due messages in batches, sends all batches over
+one reused connection, and reschedules failures with exponential backoff. A
+message is given up on (status "failed") after ``OUTBOX_MAX_ATTEMPTS`` tries.
+
+Claiming and backoff are shared with the job queue (jobs.claims): several
+workers can drain the same table without sending a message twice.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, transaction
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+from jobs.claims import BatchResult, WorkTable
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX = WorkTable(
+    OutboundEmail, ready=OutboundEmail.PENDING, claimed=OutboundEmail.SENDING, due_field='next_attempt_at',
+    backoff_base=timedelta(seconds=30), backoff_max=timedelta(hours=6), claim_timeout=timedelta(minutes=10),
+)
+
+
+class DrainResult(BatchResult):
+    @property
+    def sent(self) -> int:
+        return self.done
+
+
+def enqueue(subject, body, to, *, from_email=None, html_body='', key=None) -> OutboundEmail | None:
+    """Queue a message in the current transaction; returns None if ``key`` was queued before."""
+    to = [to] if isinstance(to, str) else list(to)
+    message = OutboundEmail(
+        key=key,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+    )
+    if key is None:
+        message.save()
+        return message
+    try:
+        with transaction.atomic():
+            message.save()
+    except IntegrityError:
+        return None
+    return message
+
+
+def enqueue_template(template, context, to, *, subject, key=None) -> OutboundEmail | None:
+    """Queue ``notifications/<template>.txt`` (and ``.html`` if it exists) rendered with ``context``."""
+    body = render_to_string(f'notifications/{template}.txt', context)
+    try:
+        html_body = render_to_string(f'notifications/{template}.html', context)
+    except TemplateDoesNotExist:
+        html_body = ''
+    return enqueue(subject, body, to, html_body=html_body, key=key)
+
+
+def _fail(message, error, max_attempts, result) -> None:
+    message.attempts += 1
+    message.last_error = error[:2000]
+    if message.attempts >= max_attempts:
+        message.status = OutboundEmail.FAILED
+        result.failed += 1
+        logger.error('Giving up on outbound email %s after %s attempts: %s', message.pk, message.attempts, error)
+    else:
+        message.status = OutboundEmail.PENDING
+        message.next_attempt_at = timezone.now() + OUTBOX.backoff(message.attempts)
+        result.retried += 1
+
+
+def _record(messages) -> None:
+    for message in messages:
+        message.claimed_by = ''
+    OutboundEmail.objects.bulk_update(
+        messages, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'claimed_by'],
+    )
+
+
+def send_batch(messages, connection, max_attempts) -> DrainResult:
+    """Send ``messages`` over an open ``connection`` and record the outcome of each."""
+    result = DrainResult()
+    for message in messages:
+        email = EmailMultiAlternatives(message.subject, message.body, message.from_email, message.to, connection=connection)
+        if message.html_body:
+            email.attach_alternative(message.html_body, 'text/html')
+        try:
+            email.send()
+        except Exception as e:
+            _fail(message, repr(e), max_attempts, result)
+        else:
+            message.status = OutboundEmail.SENT
+            message.sent_at = timezone.now()
+            message.last_error = ''
+            result.done += 1
+    _record(messages)
+    return result
+
+
+def drain(batch_size=None, max_batches=None, worker=None) -> DrainResult:
+    """Send everything that is due in batches of ``batch_size``, all over one connection."""
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8)
+    worker = worker or uuid.uuid4().hex
+    total = DrainResult()
+    OUTBOX.release_stale_claims()
+    connection = None
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            messages = OUTBOX.claim(batch_size, worker)
+            if not messages:
+                break
+            batches += 1
+            if connection is None:
+                connection = get_connection(getattr(settings, 'OUTBOX_EMAIL_BACKEND', None))
+                try:
+                    connection.open()
+                except Exception as e:
+                    # Server unreachable: push the whole batch back and stop until the next run.
+                    connection = None
+                    for message in messages:
+                        _fail(message, f'connection: {e!r}', max_attempts, total)
+                    _record(messages)
+                    break
+            result = send_batch(messages, connection, max_attempts)
+            total.add(result)
+    finally:
+        if connection is not None:
+            connection.close()
+    return total
@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+from jobs.queue import enqueue
+from orders.signals import order_paid
+
+
+@receiver(order_paid)
+def queue_order_confirmation(sender, order, lines, **kwargs):
+    if order.user_id and order.user.email:
+        # Rendering happens in the job; the outbox key stops a retried job from mailing twice.
+        enqueue('notifications.order_confirmation', {'order_id': order.pk}, key=f'order-confirmation:{order.pk}')
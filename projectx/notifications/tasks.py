@@ -0,0 +1,17 @@
+from jobs.queue import register
+from orders.models import Order
+
+from . import outbox
+
+
+@register('notifications.order_confirmation')
+def order_confirmation(order_id):
+    order = Order.objects.select_related('user').filter(pk=order_id).first()
+    email = order.user.email if order and order.user_id else ''
+    if not email:
+        return
+    lines = [(item.product, item.quantity, item.price) for item in order.items.select_related('product')]
+    outbox.enqueue_template(
+        'order_paid', {'order': order, 'user': order.user, 'lines': lines}, email,
+        subject=f'Your ShopX order #{order.pk}', key=f'order-paid:{order.pk}',
+    )
@@ -1,5 +1,26 @@
+import hashlib
+
 from django.contrib import admin
-from .models import Order, OrderItem
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+from .models import CustomerOrderSummary, Order, OrderItem
+
+
+class CachedCountPaginator(Paginator):
+    """Caches the changelist COUNT(*) for a minute instead of running it on every page load."""
+    count_timeout = 60
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.query.sql_with_params()
+        key = 'admin:count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, self.count_timeout)
+        return count
 
 
 class OrderItemInline(admin.TabularInline):
@@ -11,8 +32,18 @@ class OrderItemInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("id", "get_user", "get_products", "get_quantities", "status", "total_amount", "created_at")
     list_select_related = ['user']
+    list_filter = ("status", "created_at")
+    # Newest first along order_status_created_idx, so a status filter needs no sort
+    ordering = ("-created_at", "-id")
+    paginator = CachedCountPaginator
+    # Skip the extra unfiltered COUNT(*) shown next to filtered results
+    show_full_result_count = False
     inlines = [OrderItemInline]
 
+    def get_queryset(self, request):
+        items = OrderItem.objects.select_related("product").only("order", "quantity", "product", "product__name")
+        return super().get_queryset(request).prefetch_related(Prefetch("items", queryset=items))
+
     def get_user(self, obj):
         return obj.user.username if obj.user else "Guest"
     get_user.short_description = "Customer"
@@ -26,3 +57,16 @@ class OrderAdmin(admin.ModelAdmin):
     get_quantities.short_description = "Quantities"
 
 
+@admin.register(CustomerOrderSummary)
+class CustomerOrderSummaryAdmin(admin.ModelAdmin):
+    """Read-only: checkout maintains these (see orders.history; rebuild_order_summaries repairs them)."""
+    list_display = ("user", "order_count", "lifetime_spend", "last_order_at")
+    list_select_related = ["user"]
+    ordering = ("-lifetime_spend",)
+    search_fields = ("user__username", "user__email")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
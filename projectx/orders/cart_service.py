@@ -0,0 +1,209 @@
+"""
+Atomic cart mutations.
+
+Quantities are changed with a single ``UPDATE ... SET quantity = quantity + n``
+so concurrent requests (double clicks from cart.js) can't lose updates. A
+missing line is inserted instead; if another request wins that insert, the
+unique (cart, product) constraint makes us fall back to the UPDATE.
+
+Every mutation also refreshes the denormalized totals on the Cart row
+(item_count, line_count, subtotal_amount) inside the same transaction, so
+reading them later never touches CartItem. Each call returns the new line
+and the cart totals.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Cart, CartItem
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+CENT = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class CartTotals:
+    item_count: int
+    line_count: int
+    subtotal: Decimal
+
+    def as_dict(self) -> dict:
+        return {'item_count': self.item_count, 'line_count': self.line_count, 'subtotal': str(self.subtotal)}
+
+
+EMPTY_TOTALS = CartTotals(item_count=0, line_count=0, subtotal=Decimal('0.00'))
+
+
+@dataclass(frozen=True)
+class CartLine:
+    product_id: int
+    quantity: int
+    line_total: Decimal
+
+
+@dataclass(frozen=True)
+class CartMutation:
+    line: CartLine
+    totals: CartTotals
+
+
+def _lock(cart) -> None:
+    # Serializes mutations of one cart so the totals below see every line change.
+    list(Cart.objects.select_for_update().filter(pk=cart.pk).values_list('pk'))
+
+
+def _refresh_totals(cart) -> None:
+    """Recompute the cart's totals from its lines in a single UPDATE."""
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    Cart.objects.filter(pk=cart.pk).update(
+        item_count=Coalesce(Subquery(lines.annotate(n=Sum('quantity')).values('n')), 0),
+        line_count=Coalesce(Subquery(lines.annotate(n=Count('id')).values('n')), 0),
+        subtotal_amount=Coalesce(
+            Subquery(lines.annotate(n=Sum(F('quantity') * F('unit_price'), output_field=MONEY)).values('n')),
+            Value(Decimal('0.00')),
+            output_field=MONEY,
+        ),
+    )
+
+
+def _upsert(cart, product, values: dict, create_quantity: int) -> None:
+    lines = CartItem.objects.filter(cart=cart, product=product)
+    if lines.update(**values):
+        return
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(cart=cart, product=product, quantity=create_quantity, unit_price=product.price)
+    except IntegrityError:
+        # Another request inserted the line first; apply ours on top of it.
+        lines.update(**values)
+
+
+def get_totals(cart) -> CartTotals:
+    return CartTotals(item_count=cart.item_count, line_count=cart.line_count, subtotal=cart.subtotal_amount)
+
+
+def snapshot(cart, product_id: int) -> CartMutation:
+    """The line for ``product_id`` and the cart totals, in one query.
+
+    The totals are copied onto ``cart`` so the caller's instance stays current.
+    """
+    line = CartItem.objects.filter(cart=OuterRef('pk'), product_id=product_id)
+    row = Cart.objects.filter(pk=cart.pk).annotate(
+        line_quantity=Subquery(line.values('quantity')),
+        line_price=Subquery(line.values('unit_price')),
+    ).values('item_count', 'line_count', 'subtotal_amount', 'line_quantity', 'line_price').get()
+    cart.item_count = row['item_count']
+    cart.line_count = row['line_count']
+    cart.subtotal_amount = Decimal(row['subtotal_amount']).quantize(CENT)
+    quantity = row['line_quantity'] or 0
+    line_total = (Decimal(row['line_price']) * quantity if quantity else Decimal('0')).quantize(CENT)
+    return CartMutation(
+        line=CartLine(product_id=product_id, quantity=quantity, line_total=line_total),
+        totals=get_totals(cart),
+    )
+
+
+def increment(cart, product, quantity: int = 1) -> CartMutation:
+    if quantity > 0:
+        with transaction.atomic():
+            _lock(cart)
+            # Keep the last known product price as unit_price
+            _upsert(cart, product, {'quantity': F('quantity') + quantity, 'unit_price': product.price}, quantity)
+            _refresh_totals(cart)
+    return snapshot(cart, product.pk)
+
+
+def decrement(cart, product, quantity: int = 1) -> CartMutation:
+    """Lower the quantity by ``quantity``; the line is removed once it would reach zero."""
+    if quantity > 0:
+        with transaction.atomic():
+            _lock(cart)
+            lines = CartItem.objects.filter(cart=cart, product=product)
+            if not lines.filter(quantity__gt=quantity).update(quantity=F('quantity') - quantity):
+                lines.filter(quantity__lte=quantity).delete()
+            _refresh_totals(cart)
+    return snapshot(cart, product.pk)
+
+
+def set_quantity(cart, product, quantity: int) -> CartMutation:
+    if quantity <= 0:
+        return remove(cart, product)
+    with transaction.atomic():
+        _lock(cart)
+        _upsert(cart, product, {'quantity': quantity, 'unit_price': product.price}, quantity)
+        _refresh_totals(cart)
+    return snapshot(cart, product.pk)
+
+
+def remove(cart, product) -> CartMutation:
+    with transaction.atomic():
+        _lock(cart)
+        CartItem.objects.filter(cart=cart, product=product).delete()
+        _refresh_totals(cart)
+    return snapshot(cart, product.pk)
+
+
+def clear(cart) -> None:
+    with transaction.atomic():
+        _lock(cart)
+        CartItem.objects.filter(cart=cart).delete()
+        Cart.objects.filter(pk=cart.pk).update(item_count=0, line_count=0, subtotal_amount=0)
+    cart.item_count, cart.line_count, cart.subtotal_amount = 0, 0, Decimal('0.00')
+
+
+def remove_quantities(cart, quantities: dict) -> None:
+    """Subtract ``{product_id: quantity}`` (e.g. an order placed from the cart); lines reaching zero go."""
+    if not quantities:
+        return
+    with transaction.atomic():
+        _lock(cart)
+        lines = list(CartItem.objects.filter(cart=cart, product_id__in=quantities).only('id', 'product_id', 'quantity'))
+        emptied = [line.pk for line in lines if line.quantity <= quantities[line.product_id]]
+        kept = [line for line in lines if line.pk not in emptied]
+        for line in kept:
+            line.quantity -= quantities[line.product_id]
+        CartItem.objects.filter(pk__in=emptied).delete()
+        CartItem.objects.bulk_update(kept, ['quantity'])
+        _refresh_totals(cart)
+
+
+def merge(cart, quantities: dict) -> None:
+    """Add ``{product_id: quantity}`` (an anonymous cart) to ``cart`` with one bulk upsert."""
+    from products.models import Product
+
+    if not quantities:
+        return
+    with transaction.atomic():
+        _lock(cart)
+        existing = dict(
+            CartItem.objects.filter(cart=cart, product_id__in=quantities).values_list('product_id', 'quantity')
+        )
+        prices = dict(Product.objects.filter(id__in=quantities).values_list('id', 'price'))
+        CartItem.objects.bulk_create(
+            [
+                CartItem(cart=cart, product_id=pid, quantity=existing.get(pid, 0) + qty, unit_price=prices[pid])
+                for pid, qty in quantities.items() if pid in prices and qty > 0
+            ],
+            update_conflicts=True,
+            unique_fields=['cart', 'product'],
+            update_fields=['quantity', 'unit_price'],
+        )
+        _refresh_totals(cart)
+
+
+def anonymous_totals(quantities: dict) -> CartTotals:
+    """Totals for an anonymous ``{product_id: quantity}`` cart."""
+    from products.models import Product
+
+    if not quantities:
+        return EMPTY_TOTALS
+    prices = dict(Product.objects.filter(id__in=quantities).values_list('id', 'price'))
+    lines = {pid: qty for pid, qty in quantities.items() if pid in prices}
+    return CartTotals(
+        item_count=sum(lines.values()),
+        line_count=len(lines),
+        subtotal=sum((prices[pid] * qty for pid, qty in lines.items()), Decimal('0.00')),
+    )
@@ -0,0 +1,185 @@
+"""
+Storage for anonymous carts.
+
+Anonymous carts used to live in ``request.session['cart']``, which costs a
+session SELECT and UPDATE on every cart click. Views now go through
+``get_cart_store(request)``; the backend is picked with
+``settings.ANONYMOUS_CART_STORE``:
+
+* ``SignedCookieCartStore`` keeps the cart in a compact signed cookie (no
+  server-side state at all),
+* ``CacheCartStore`` keeps it in the cache under a random token cookie,
+* ``SessionCartStore`` is the old session-based behaviour.
+
+``AnonymousCartMiddleware`` writes the cart back to the response, and the
+cart is merged into the user's DB cart on login (see orders.apps).
+"""
+import secrets
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+COOKIE_NAME = 'cart'
+COOKIE_SALT = 'orders.cart_store'
+COOKIE_MAX_AGE = 60 * 60 * 24 * 14
+# A cookie must stay below ~4KB; that leaves room for about this many lines.
+MAX_LINES = 100
+
+
+class CartStore:
+    """``{product_id: quantity}`` for one anonymous visitor."""
+
+    def __init__(self, request):
+        self.request = request
+        self.modified = False
+        self._items = None
+
+    def load(self) -> dict:
+        raise NotImplementedError
+
+    def save(self, response) -> None:
+        raise NotImplementedError
+
+    def items(self) -> dict:
+        if self._items is None:
+            self._items = {int(pid): int(qty) for pid, qty in self.load().items() if int(qty) > 0}
+        return self._items
+
+    def __bool__(self):
+        return bool(self.items())
+
+    def quantity(self, product_id: int) -> int:
+        return self.items().get(product_id, 0)
+
+    def item_count(self) -> int:
+        return sum(self.items().values())
+
+    def add(self, product_id: int, quantity: int = 1) -> int:
+        items = self.items()
+        if product_id not in items and len(items) >= MAX_LINES:
+            return 0
+        items[product_id] = items.get(product_id, 0) + quantity
+        self.modified = True
+        return items[product_id]
+
+    def decrease(self, product_id: int, quantity: int = 1) -> int:
+        items = self.items()
+        if product_id not in items:
+            return 0
+        items[product_id] -= quantity
+        if items[product_id] <= 0:
+            del items[product_id]
+        self.modified = True
+        return items.get(product_id, 0)
+
+    def remove(self, product_id: int) -> None:
+        if self.items().pop(product_id, None) is not None:
+            self.modified = True
+
+    def clear(self) -> None:
+        if self.items():
+            self._items = {}
+            self.modified = True
+
+    def _set_cookie(self, response, value) -> None:
+        response.set_cookie(
+            COOKIE_NAME, value, max_age=COOKIE_MAX_AGE, httponly=True,
+            secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+        )
+
+
+class SessionCartStore(CartStore):
+    def load(self) -> dict:
+        return self.request.session.get('cart', {})
+
+    def save(self, response) -> None:
+        self.request.session['cart'] = {str(pid): qty for pid, qty in self.items().items()}
+
+
+class SignedCookieCartStore(CartStore):
+    def load(self) -> dict:
+        value = self.request.COOKIES.get(COOKIE_NAME)
+        if not value:
+            return {}
+        try:
+            return signing.loads(value, salt=COOKIE_SALT, max_age=COOKIE_MAX_AGE)
+        except (signing.BadSignature, ValueError):
+            return {}
+
+    def save(self, response) -> None:
+        if not self.items():
+            response.delete_cookie(COOKIE_NAME, samesite='Lax')
+            return
+        self._set_cookie(response, signing.dumps(self.items(), salt=COOKIE_SALT, compress=True))
+
+
+class CacheCartStore(CartStore):
+    """Cart kept in the cache; the cookie only carries an opaque signed token."""
+
+    def _token(self, create=False):
+        token = getattr(self, '_cached_token', None)
+        if token is None:
+            token = self.request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT)
+            if token is None and create:
+                token = secrets.token_urlsafe(16)
+            self._cached_token = token
+        return token
+
+    def load(self) -> dict:
+        token = self._token()
+        return cache.get(f'cart:{token}', {}) if token else {}
+
+    def save(self, response) -> None:
+        if not self.items():
+            token = self._token()
+            if token:
+                cache.delete(f'cart:{token}')
+                response.delete_cookie(COOKIE_NAME, samesite='Lax')
+            return
+        token = self._token(create=True)
+        cache.set(f'cart:{token}', self.items(), COOKIE_MAX_AGE)
+        response.set_signed_cookie(
+            COOKIE_NAME, token, salt=COOKIE_SALT, max_age=COOKIE_MAX_AGE, httponly=True,
+            secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+        )
+
+
+def get_cart_store(request) -> CartStore:
+    store = getattr(request, '_anonymous_cart', None)
+    if store is None:
+        backend = getattr(settings, 'ANONYMOUS_CART_STORE', 'orders.cart_store.SignedCookieCartStore')
+        store = import_string(backend)(request)
+        request._anonymous_cart = store
+    return store
+
+
+class AnonymousCartMiddleware:
+    """Persists the anonymous cart if a view changed it (sync or async stack)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        store = getattr(request, '_anonymous_cart', None)
+        if store is not None and store.modified:
+            store.save(response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        store = getattr(request, '_anonymous_cart', None)
+        if store is not None and store.modified:
+            # Stores may hit the session or cache backends, which are sync.
+            await sync_to_async(store.save)(response)
+        return response
@@ -0,0 +1,119 @@
+"""
+Checkout pipeline.
+
+An order and all of its items are written inside one transaction: the cart
+rows are locked, the items are inserted with a single bulk_create and the
+optional payment step runs before commit, so a crash can never leave a
+half-written order behind. Stock is reserved last (inventory.stock) and an
+OutOfStock error rolls the whole order back. Listeners of ``order_paid`` run inside the same
+transaction and only queue jobs (jobs.queue) for the slow side effects, such
+as the confirmation email; clearing the cart is queued the same way. Each
+stage is timed and the timings are returned with the order.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from inventory import stock
+from jobs.queue import enqueue
+
+from .models import Order, OrderItem
+from .signals import order_paid
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckoutResult:
+    order: Order
+    timings: dict = field(default_factory=dict)
+
+    def server_timing(self) -> str:
+        return ', '.join(f'checkout-{stage};dur={ms:.1f}' for stage, ms in self.timings.items())
+
+
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (time.perf_counter() - started) * 1000
+
+
+def _write_order(timer, user, lines, mark_paid) -> Order:
+    total = sum((price * qty for _, qty, price in lines), Decimal('0.00'))
+    now = timezone.now()
+    with timer.stage('order'):
+        order = Order.objects.create(
+            user=user,
+            total_amount=total,
+            status='paid' if mark_paid else 'pending',
+            paid_at=now if mark_paid else None,
+        )
+    with timer.stage('items'):
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=qty, price=price)
+            for product, qty, price in lines
+        ])
+    with timer.stage('stock'):
+        reservations = stock.reserve(order, lines)
+    if mark_paid:
+        if reservations:
+            # Paid: the held stock becomes sold stock, outside this transaction.
+            enqueue('inventory.commit_order', {'order_id': order.pk}, key=f'commit-stock:{order.pk}')
+        order_paid.send(sender=Order, order=order, lines=lines)
+    return order
+
+
+def place_order(user, lines, mark_paid: bool = False) -> CheckoutResult | None:
+    """Create an order from ``(product, quantity, unit_price)`` tuples."""
+    lines = [line for line in lines if line[1] > 0]
+    if not lines:
+        return None
+    timer = StageTimer()
+    with timer.stage('total'), transaction.atomic():
+        order = _write_order(timer, user, lines, mark_paid)
+    return _finish(order, timer)
+
+
+def place_order_from_cart(cart, user=None, mark_paid: bool = False, clear_cart: bool = False) -> CheckoutResult | None:
+    """Create an order from a DB cart.
+
+    The cart is left untouched unless ``clear_cart``, which queues a job that
+    removes the ordered lines from it once the order has committed.
+    """
+    timer = StageTimer()
+    with timer.stage('total'), transaction.atomic():
+        with timer.stage('lock'):
+            # Lock the lines so a concurrent mutation can't change them mid-checkout.
+            items = list(cart.items.select_for_update().select_related('product'))
+        if not items:
+            return None
+        lines = [(ci.product, ci.quantity, ci.unit_price) for ci in items]
+        order = _write_order(timer, user or cart.user, lines, mark_paid)
+        if clear_cart:
+            enqueue(
+                'orders.clear_checked_out_cart',
+                {'cart_id': cart.pk, 'quantities': {str(ci.product_id): ci.quantity for ci in items}},
+                key=f'clear-cart:{order.pk}',
+            )
+    return _finish(order, timer)
+
+
+def _finish(order, timer) -> CheckoutResult:
+    result = CheckoutResult(order=order, timings=timer.timings)
+    logger.info(
+        'checkout order=%s total=%s %s', order.pk, order.total_amount,
+        ' '.join(f'{stage}={ms:.1f}ms' for stage, ms in result.timings.items()),
+        extra={'order_id': order.pk, 'checkout_timings': result.timings},
+    )
+    return result
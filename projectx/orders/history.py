@@ -0,0 +1,124 @@
+"""
+Customer order history.
+
+``CustomerOrderSummary`` holds each customer's paid-order count, lifetime
+spend and last order, so the "My orders" page never aggregates Order rows.
+Checkout sends ``order_paid`` inside its transaction, and ``record_paid``
+adds the order to the summary with one UPDATE (an INSERT for a customer's
+first order). ``rebuild`` recomputes summaries from the orders themselves,
+e.g. after orders were edited in the admin (the rebuild_order_summaries
+command).
+
+``order_page`` loads one page of a customer's orders, newest first. It uses
+keyset paging over the (user, -created_at) index and loads the page's items
+with one prefetch. A page costs the same number of queries however many
+orders the customer has.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BigIntegerField, Case, Count, DateTimeField, F, OuterRef, Prefetch, Q, Subquery, Sum, Value, When,
+)
+from django.utils import timezone
+from products.pagination import keyset_page
+
+from .models import CustomerOrderSummary, Order, OrderItem
+
+ORDER_PAGE_SIZE = 10
+
+
+def record_paid(order) -> None:
+    """Add a newly paid ``order`` to its customer's summary."""
+    if order.user_id is None:
+        return
+    paid_at = order.paid_at or timezone.now()
+    summaries = CustomerOrderSummary.objects.filter(user_id=order.user_id)
+    # Orders paid concurrently may commit out of order; keep the latest as the last order.
+    newer = Q(last_order_at__isnull=True) | Q(last_order_at__lte=paid_at)
+    changes = {
+        'order_count': F('order_count') + 1,
+        'lifetime_spend': F('lifetime_spend') + order.total_amount,
+        'last_order': Case(When(newer, then=Value(order.pk)), default=F('last_order'), output_field=BigIntegerField()),
+        'last_order_at': Case(When(newer, then=Value(paid_at)), default=F('last_order_at'), output_field=DateTimeField()),
+    }
+    if summaries.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            CustomerOrderSummary.objects.create(
+                user_id=order.user_id, order_count=1, lifetime_spend=order.total_amount,
+                last_order=order, last_order_at=paid_at,
+            )
+    except IntegrityError:
+        # The customer's first two orders were paid at the same time.
+        summaries.update(**changes)
+
+
+def rebuild(user_ids=None) -> int:
+    """Recompute the summaries of ``user_ids`` (default: everyone) from their paid orders."""
+    paid = Order.objects.filter(status='paid', user__isnull=False)
+    if user_ids is not None:
+        paid = paid.filter(user_id__in=user_ids)
+    # Both from the same order, the one record_paid would have kept as the last.
+    last = Order.objects.filter(status='paid', user=OuterRef('user_id')).order_by('-paid_at', '-id')
+    rows = paid.values('user_id').annotate(
+        count=Count('id'), spend=Sum('total_amount'),
+        last_id=Subquery(last.values('id')[:1]), last_at=Subquery(last.values('paid_at')[:1]),
+    ).order_by()
+    with transaction.atomic():
+        summaries = [
+            CustomerOrderSummary(
+                user_id=row['user_id'], order_count=row['count'], lifetime_spend=row['spend'],
+                last_order_id=row['last_id'], last_order_at=row['last_at'],
+            )
+            for row in rows
+        ]
+        existing = CustomerOrderSummary.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        CustomerOrderSummary.objects.bulk_create(summaries, batch_size=500)
+    return len(summaries)
+
+
+def get_summary(user) -> CustomerOrderSummary:
+    """The customer's summary; an empty, unsaved one if they have no paid orders yet."""
+    return CustomerOrderSummary.objects.filter(user=user).first() or CustomerOrderSummary(user=user)
+
+
+def customer_orders(user):
+    items = OrderItem.objects.select_related('product').only(
+        'order', 'quantity', 'price', 'product__name', 'product__slug',
+    )
+    return Order.objects.filter(user=user).prefetch_related(Prefetch('items', queryset=items))
+
+
+def order_page(user, cursor, size: int = ORDER_PAGE_SIZE):
+    return keyset_page(customer_orders(user), cursor, size)
+
+
+def summary_as_dict(summary) -> dict:
+    return {
+        'order_count': summary.order_count,
+        'lifetime_spend': str(summary.lifetime_spend),
+        'last_order_id': summary.last_order_id,
+        'last_order_at': summary.last_order_at.isoformat() if summary.last_order_at else None,
+    }
+
+
+def order_as_dict(order) -> dict:
+    return {
+        'id': order.pk,
+        'status': order.status,
+        'total_amount': str(order.total_amount),
+        'created_at': order.created_at.isoformat(),
+        'paid_at': order.paid_at.isoformat() if order.paid_at else None,
+        'items': [
+            {
+                'product': item.product.name,
+                'slug': item.product.slug,
+                'quantity': item.quantity,
+                'price': str(item.price),
+            }
+            for item in order.items.all()
+        ],
+    }
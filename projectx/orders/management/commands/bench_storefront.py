@@ -0,0 +1,186 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+from caching import backends as cache_backends
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import resolve, reverse
+from products.models import Product
+from projectx.instrumentation import QueryRecorder, get_query_budget
+
+ENDPOINTS = ('home', 'category_list', 'search', 'product_detail', 'add_to_cart', 'cart_view', 'checkout_start')
+SEARCH_TERMS = ('shirt', 'blue denim', 'sneak', 'leather jacket', 'summer', 'black watch')
+# The run is wrapped in a transaction, which turns every atomic() block into
+# savepoint statements that a real request wouldn't run.
+SAVEPOINT_SQL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the storefront through the test client and report latency percentiles, queries and memory "
+        "per endpoint as a table and a JSON file. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Visits per endpoint")
+        parser.add_argument('--warmup', type=int, default=3, help="Untimed visits first, to warm caches")
+        parser.add_argument('--memory-samples', type=int, default=3, help="Extra visits traced with tracemalloc")
+        parser.add_argument('--anonymous', action='store_true', help="Shop without logging in")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="JSON results file (default: storefront-bench-<timestamp>.json)")
+        parser.add_argument('--compare', help="Earlier JSON results to diff against")
+
+    def handle(self, *args, **options):
+        product_ids = list(Product.objects.values_list('id', flat=True)[:100_000])
+        if not product_ids:
+            raise CommandError("No products found; run seed_demo or generate_load_data first.")
+        self.rng = random.Random(options['seed'])
+        sample = Product.objects.select_related('category').in_bulk(
+            self.rng.sample(product_ids, min(len(product_ids), 500))
+        )
+        self.products = list(sample.values())
+        self.budgets = {}
+
+        with transaction.atomic():
+            client = Client(HTTP_HOST='localhost')
+            if not options['anonymous']:
+                user = get_user_model().objects.create_user(username='bench-storefront')
+                client.force_login(user)
+            for _ in range(options['warmup']):
+                list(self._visit_all(client))
+            cache_backends.reset_stats()
+            samples = {name: {'ms': [], 'queries': [], 'status': set()} for name in ENDPOINTS}
+            for _ in range(options['iterations']):
+                for name, elapsed, queries, status in self._visit_all(client):
+                    samples[name]['ms'].append(elapsed)
+                    samples[name]['queries'].append(queries)
+                    samples[name]['status'].add(status)
+            cache_stats = cache_backends.stats()
+            memory = self._memory(client, options['memory_samples'])
+            transaction.set_rollback(True)
+
+        results = {
+            'meta': self._meta(options, len(product_ids)),
+            'endpoints': {name: self._summary(name, samples[name], memory.get(name)) for name in ENDPOINTS},
+            'caches': cache_stats,
+        }
+        self._print(results, self._load(options['compare']))
+        path = options['output'] or f"storefront-bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+    def _requests(self):
+        """One shopping session: ``(endpoint, method, url, extra)`` in the order a customer would go."""
+        product = self.rng.choice(self.products)
+        return [
+            ('home', 'get', reverse('products:home'), {}),
+            ('category_list', 'get', reverse('products:category_list', args=[product.category.slug]), {}),
+            ('search', 'get', f"{reverse('products:search')}?q={self.rng.choice(SEARCH_TERMS)}", {}),
+            ('product_detail', 'get', reverse('products:product_detail', args=[product.slug]), {}),
+            ('add_to_cart', 'get', reverse('products:add_to_cart', args=[product.slug]),
+             {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}),
+            ('cart_view', 'get', reverse('products:cart_view'), {}),
+            ('checkout_start', 'get', reverse('orders:checkout_start'), {}),
+        ]
+
+    def _visit_all(self, client):
+        for name, method, url, extra in self._requests():
+            if name not in self.budgets:
+                self.budgets[name] = get_query_budget(resolve(url.split('?')[0]))
+            with QueryRecorder() as recorder:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, **extra)
+                elapsed = (time.perf_counter() - started) * 1000
+            queries = sum(1 for sql, _ in recorder.queries if not sql.startswith(SAVEPOINT_SQL))
+            yield name, elapsed, queries, response.status_code
+
+    def _memory(self, client, rounds):
+        """Peak Python allocations per endpoint, in KB (tracemalloc slows requests, so this is a separate pass)."""
+        peaks = {}
+        tracemalloc.start()
+        try:
+            for _ in range(rounds):
+                for name, method, url, extra in self._requests():
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    getattr(client, method)(url, **extra)
+                    peak = (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+                    peaks[name] = max(peaks.get(name, 0), peak)
+        finally:
+            tracemalloc.stop()
+        return peaks
+
+    def _summary(self, name, sample, memory_kb):
+        ms = sorted(sample['ms'])
+        cuts = statistics.quantiles(ms, n=100, method='inclusive') if len(ms) > 1 else ms * 99
+        return {
+            'requests': len(ms),
+            'p50_ms': round(statistics.median(ms), 2),
+            'p95_ms': round(cuts[94], 2),
+            'p99_ms': round(cuts[98], 2),
+            'max_ms': round(ms[-1], 2),
+            'queries_median': statistics.median(sample['queries']),
+            'queries_max': max(sample['queries']),
+            'query_budget': self.budgets.get(name),
+            'memory_peak_kb': round(memory_kb, 1) if memory_kb is not None else None,
+            'status_codes': sorted(sample['status']),
+        }
+
+    def _meta(self, options, product_count):
+        try:
+            revision = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            ).stdout.strip() or None
+        except OSError:
+            revision = None
+        return {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': revision,
+            'database': connection.vendor,
+            'products': product_count,
+            'iterations': options['iterations'],
+            'anonymous': options['anonymous'],
+            'debug': settings.DEBUG,
+        }
+
+    def _load(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)['endpoints']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Can't read {path}: {e}")
+
+    def _print(self, results, previous):
+        self.stdout.write(
+            f"{'endpoint':16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'budget':>6} {'mem KB':>8}"
+        )
+        for name, r in results['endpoints'].items():
+            over = r['query_budget'] is not None and r['queries_max'] > r['query_budget']
+            line = (
+                f"{name:16} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} "
+                f"{r['queries_max']:8} {r['query_budget'] if r['query_budget'] is not None else '-':>6} "
+                f"{r['memory_peak_kb'] or 0:8.0f}"
+            )
+            if previous and name in previous:
+                before = previous[name]
+                line += f"   p50 {r['p50_ms'] - before['p50_ms']:+.2f}ms queries {r['queries_max'] - before['queries_max']:+d}"
+            self.stdout.write(self.style.WARNING(line) if over else line)
+        for name, counts in results['caches'].items():
+            lookups = counts.get('local_hits', 0) + counts.get('shared_hits', 0) + counts.get('misses', 0)
+            if lookups:
+                self.stdout.write(
+                    f"cache {name}: {counts.get('local_hits', 0) / lookups:.0%} local hits, "
+                    f"{counts.get('shared_hits', 0) / lookups:.0%} shared hits, {counts.get('misses', 0)} misses, "
+                    f"{counts.get('computes', 0)} computes, {counts.get('stale_served', 0)} stale served"
+                )
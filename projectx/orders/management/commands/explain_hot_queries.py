@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from orders.models import Cart, CartItem, Order
+from products import homepage
+from products.models import Category, Product
+from products.pagination import after_cursor, encode_cursor
+from products.search import FTS_TABLE, ORMSearchBackend
+
+
+def explain(queryset) -> str:
+    # QuerySet.explain() can't handle querysets filtered on a window function
+    # (the homepage shelves), so compile the SQL and prefix it ourselves.
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+
+class Command(BaseCommand):
+    help = "Print the EXPLAIN plan of every hot query in products.views and orders.views"
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Only explain these queries")
+
+    def handle(self, *args, **options):
+        for name, plan in self.hot_queries():
+            if options['names'] and name not in options['names']:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan())
+            self.stdout.write('')
+
+    def hot_queries(self):
+        category = Category.objects.order_by('id').first() or Category(id=0, slug='')
+        product = Product.objects.order_by('-id').first() or Product(id=0, slug='', created_at=timezone.now())
+        user = get_user_model().objects.order_by('id').first()
+        user_id = user.pk if user else 0
+        cart_id = Cart.objects.filter(user_id=user_id).values_list('id', flat=True).first() or 0
+
+        return [
+            ('home: shelves', lambda: explain(homepage.shelves_queryset())),
+            ('category_list: first page', lambda: explain(after_cursor(category.products.all(), None)[:49])),
+            ('category_list: next page',
+             lambda: explain(after_cursor(category.products.all(), encode_cursor(product))[:49])),
+            ('product_detail', lambda: explain(Product.objects.filter(slug=product.slug))),
+            ('search: orm', lambda: explain(ORMSearchBackend().search('shirt')[:24])),
+            ('search: fts5', self.explain_fts),
+            ('cart_view', lambda: explain(CartItem.objects.filter(cart_id=cart_id).select_related('product'))),
+            ('cart_summary', lambda: explain(Cart.objects.filter(user_id=user_id))),
+            ('checkout: lock cart lines', lambda: explain(CartItem.objects.filter(cart_id=cart_id).select_related('product'))),
+            ('payment callback: order by session id', lambda: explain(Order.objects.filter(stripe_session_id='cs_test'))),
+            ('customer orders, newest first', lambda: explain(Order.objects.filter(user_id=user_id).order_by('-created_at')[:20])),
+            ('stale pending orders',
+             lambda: explain(Order.objects.filter(status='pending', created_at__lt=timezone.now() - timedelta(hours=1)))),
+            ('admin: orders by status',
+             lambda: explain(Order.objects.filter(status='paid').order_by('-created_at', '-id')[:100])),
+            ('admin: orders by status and date',
+             lambda: explain(Order.objects.filter(status='cancelled', created_at__gte=timezone.now() - timedelta(days=7)))),
+        ]
+
+    def explain_fts(self):
+        if connection.vendor != 'sqlite':
+            return 'n/a (FTS5 index is SQLite only)'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}) LIMIT 24', ['"shirt"*'],
+            )
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
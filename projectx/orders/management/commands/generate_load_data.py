@@ -0,0 +1,187 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from orders import history
+from orders.models import Cart, CartItem, Order, OrderItem
+from products import homepage
+from products.models import Category, Product, Tag
+from products.search import get_search_backend
+
+ADJECTIVES = (
+    "classic slim regular oversized premium organic vintage striped plain printed waterproof cotton denim "
+    "leather wool linen summer winter casual formal sport lightweight quilted ribbed relaxed cropped"
+).split()
+NOUNS = (
+    "shirt pant sneaker watch hoodie dress bag heels top jacket shoe hat backpack scarf belt sweater "
+    "coat skirt shorts sandal boot cap blazer vest jeans tee polo cardigan"
+).split()
+COLOURS = "red blue black white green navy grey beige olive pink brown yellow".split()
+DAY = timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = "Bulk-create a synthetic catalog, customers, carts and order history for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--products', type=int, default=50_000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--users', type=int, default=5_000)
+        parser.add_argument('--carts', type=int, default=1_000, help="Users with a non-empty cart")
+        parser.add_argument('--orders', type=int, default=20_000)
+        parser.add_argument('--days', type=int, default=365, help="Spread products and orders over this many days")
+        parser.add_argument('--prefix', default='load', help="Slug/username prefix, so runs can be told apart")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+        if Category.objects.filter(slug__startswith=f"{self.prefix}-").exists():
+            raise CommandError(f"Load data with prefix {self.prefix!r} already exists; pass another --prefix.")
+
+        with transaction.atomic():
+            categories = self._step("categories", self._categories, options['categories'])
+            tags = self._step("tags", self._tags, options['tags'])
+            products = self._step("products", self._products, options['products'], categories, tags)
+            users = self._step("users", self._users, options['users'])
+            self._step("carts", self._carts, min(options['carts'], len(users)), users, products)
+            self._step("orders", self._orders, options['orders'], users, products)
+            # The orders bypass checkout, so nothing has added them to the customers' summaries.
+            self._step("summaries", history.rebuild, [user.pk for user in users])
+        self._step("search index", lambda: get_search_backend().rebuild())
+        homepage.invalidate()
+
+    def _step(self, label, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        count = f"{len(result)} " if isinstance(result, list) else ""
+        self.stdout.write(f"{label:13} {count:>8}in {time.perf_counter() - started:6.1f}s")
+        return result
+
+    def _past(self, skew=1.0):
+        # Skewed towards recent dates: catalogs and order books grow over time.
+        return self.now - DAY * self.days * (self.rng.random() ** skew)
+
+    def _popular(self, items, alpha=1.1):
+        """Pick from ``items`` with a Zipf-like bias towards the front of the list."""
+        n = len(items)
+        return items[min(n - 1, int(n * self.rng.random() ** (alpha * 3)))]
+
+    def _categories(self, count):
+        return Category.objects.bulk_create(
+            [Category(slug=f"{self.prefix}-cat-{i}", name=f"{self.prefix.title()} {i}"[:50]) for i in range(count)]
+        )
+
+    def _tags(self, count):
+        return Tag.objects.bulk_create(
+            [Tag(slug=f"{self.prefix}-tag-{i}", name=f"{self.prefix}-tag-{i}") for i in range(count)]
+        )
+
+    def _products(self, count, categories, tags):
+        products = []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start, min(count, start + self.batch_size)):
+                name = f"{self.rng.choice(COLOURS)} {self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)}".title()
+                batch.append(Product(
+                    category=self._popular(categories, alpha=0.5),
+                    name=name,
+                    slug=f"{self.prefix}-product-{i}",
+                    description=" ".join(self.rng.choices(ADJECTIVES + NOUNS + COLOURS, k=30)),
+                    # Log-normal prices: most items are cheap, a long tail is expensive.
+                    price=Decimal(min(9999.0, self.rng.lognormvariate(3.5, 0.8))).quantize(Decimal('0.01')),
+                ))
+            batch = Product.objects.bulk_create(batch)
+            # auto_now_add ignores the value passed to bulk_create, so backdate afterwards.
+            for product in batch:
+                product.created_at = product.updated_at = self._past(skew=0.7)
+            Product.objects.bulk_update(batch, ['created_at', 'updated_at'])
+            Through = Product.tags.through
+            Through.objects.bulk_create(
+                [
+                    Through(product_id=product.pk, tag_id=tag.pk)
+                    for product in batch
+                    for tag in {self._popular(tags) for _ in range(self.rng.randint(0, 3))}
+                ]
+            )
+            products.extend(Product(pk=p.pk, price=p.price) for p in batch)
+        return products
+
+    def _users(self, count):
+        User = get_user_model()
+        password = make_password('load-test')
+        users = User.objects.bulk_create(
+            [
+                User(username=f"{self.prefix}-user-{i}", email=f"{self.prefix}-user-{i}@example.com", password=password)
+                for i in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+        return users
+
+    def _carts(self, count, users, products):
+        carts, lines = [], []
+        for user in self.rng.sample(users, count):
+            cart = Cart(user=user)
+            chosen = {self._popular(products) for _ in range(self.rng.randint(1, 6))}
+            cart_lines = [
+                CartItem(cart=cart, product_id=p.pk, quantity=self.rng.randint(1, 3), unit_price=p.price)
+                for p in chosen
+            ]
+            # Cart totals are normally kept by cart_service; fill them in directly here.
+            cart.item_count = sum(line.quantity for line in cart_lines)
+            cart.line_count = len(cart_lines)
+            cart.subtotal_amount = sum(line.unit_price * line.quantity for line in cart_lines)
+            carts.append(cart)
+            lines.extend(cart_lines)
+        Cart.objects.bulk_create(carts, batch_size=self.batch_size)
+        CartItem.objects.bulk_create(lines, batch_size=self.batch_size)
+        return carts
+
+    def _orders(self, count, users, products):
+        created = []
+        for start in range(0, count, self.batch_size):
+            orders, items = [], []
+            for _ in range(min(self.batch_size, count - start)):
+                placed_at = self._past(skew=0.5)
+                # Mostly paid; recent orders may still be pending.
+                roll = self.rng.random()
+                status = "paid" if roll < 0.85 else "cancelled" if roll < 0.92 else "pending"
+                order = Order(
+                    user=self._popular(users, alpha=0.4) if self.rng.random() < 0.9 else None,
+                    status=status,
+                    paid_at=placed_at + timedelta(minutes=self.rng.randint(1, 30)) if status == "paid" else None,
+                )
+                order.placed_at = placed_at
+                # Geometric basket size: one item is most common.
+                size = 1
+                while size < 8 and self.rng.random() < 0.45:
+                    size += 1
+                lines = [(self._popular(products), self.rng.randint(1, 2)) for _ in range(size)]
+                order.total_amount = sum(p.price * qty for p, qty in lines)
+                orders.append(order)
+                items.append(lines)
+            orders = Order.objects.bulk_create(orders)
+            for order in orders:
+                order.created_at = order.placed_at
+            Order.objects.bulk_update(orders, ['created_at'])
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(order=order, product_id=product.pk, quantity=qty, price=product.price)
+                    for order, lines in zip(orders, items)
+                    for product, qty in lines
+                ]
+            )
+            created.extend(orders)
+        return created
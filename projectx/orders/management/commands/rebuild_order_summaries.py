@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from orders import history
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute customer order summaries from paid orders, e.g. after orders were edited in the admin. "
+        "Checkout keeps them up to date on its own."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Only this user id (repeatable)")
+
+    def handle(self, *args, **options):
+        count = history.rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} customer order summaries"))
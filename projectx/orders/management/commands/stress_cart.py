@@ -0,0 +1,82 @@
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from orders import cart_service
+from orders.models import Cart, CartItem
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Hammer one cart from many threads and check that no quantity update is lost"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--clicks', type=int, default=25, help="Increments per thread")
+        parser.add_argument('--legacy', action='store_true', help="Use the old read-modify-write update for comparison")
+
+    def handle(self, *args, **options):
+        product = Product.objects.order_by('id').first()
+        if product is None:
+            raise CommandError("No products found; run seed_demo first.")
+
+        user = get_user_model().objects.create_user(username=f'stress-{uuid.uuid4().hex[:12]}')
+        cart = Cart.get_for_user(user)
+        threads, clicks = options['threads'], options['clicks']
+        errors = []
+        barrier = threading.Barrier(threads)
+
+        def click():
+            try:
+                barrier.wait()
+                for _ in range(clicks):
+                    for attempt in range(20):
+                        try:
+                            if options['legacy']:
+                                self._legacy_add(cart, product)
+                            else:
+                                cart_service.increment(cart, product, 1)
+                            break
+                        except OperationalError:
+                            # SQLite allows a single writer; back off and retry.
+                            time.sleep(0.01 * (attempt + 1))
+                    else:
+                        errors.append('gave up after retries')
+            except Exception as exc:
+                errors.append(repr(exc))
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            workers = [threading.Thread(target=click) for _ in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+
+            expected = threads * clicks
+            actual = CartItem.objects.filter(cart=cart, product=product).values_list('quantity', flat=True).first() or 0
+            self.stdout.write(
+                f"{threads} threads x {clicks} clicks in {elapsed:.2f}s "
+                f"({expected / elapsed:.0f} ops/s): expected {expected}, got {actual}"
+            )
+            for error in errors[:5]:
+                self.stdout.write(self.style.WARNING(error))
+            if actual != expected:
+                raise CommandError(f"Lost {expected - actual} updates")
+            self.stdout.write(self.style.SUCCESS("No lost updates"))
+        finally:
+            user.delete()
+
+    def _legacy_add(self, cart, product):
+        item, created = CartItem.objects.get_or_create(
+            cart=cart, product=product, defaults={"quantity": 1, "unit_price": product.price}
+        )
+        if not created:
+            item.quantity += 1
+            item.save()
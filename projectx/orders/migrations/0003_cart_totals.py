@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('orders', 'Cart')
+    for cart in Cart.objects.prefetch_related('items'):
+        items = list(cart.items.all())
+        cart.item_count = sum(i.quantity for i in items)
+        cart.line_count = len(items)
+        cart.subtotal_amount = sum((i.unit_price * i.quantity for i in items), Decimal('0.00'))
+        cart.save(update_fields=['item_count', 'line_count', 'subtotal_amount'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_cart_order_billing_address_order_paid_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
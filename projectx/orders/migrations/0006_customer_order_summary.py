@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    CustomerOrderSummary = apps.get_model('orders', 'CustomerOrderSummary')
+    last = Order.objects.filter(status='paid', user=OuterRef('user_id')).order_by('-paid_at', '-id')
+    rows = Order.objects.filter(status='paid', user__isnull=False).values('user_id').annotate(
+        count=Count('id'), spend=Sum('total_amount'),
+        last_id=Subquery(last.values('id')[:1]), last_at=Subquery(last.values('paid_at')[:1]),
+    ).order_by()
+    CustomerOrderSummary.objects.bulk_create(
+        (
+            CustomerOrderSummary(
+                user_id=row['user_id'], order_count=row['count'], lifetime_spend=row['spend'],
+                last_order_id=row['last_id'], last_order_at=row['last_at'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('orders', '0005_order_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerOrderSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('last_order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='orders.order')),
+            ],
+            options={
+                'verbose_name_plural': 'customer order summaries',
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -12,18 +12,47 @@ class Order(models.Model):
         ("cancelled", "Cancelled"),
     )
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Indexed with created_at below
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
-    stripe_session_id = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Payment callbacks look orders up by their checkout session id
+    stripe_session_id = models.CharField(max_length=255, blank=True, default="", db_index=True)
     shipping_address = models.TextField(blank=True, default="")
     billing_address = models.TextField(blank=True, default="")
     paid_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # A customer's orders, newest first
+            models.Index(fields=["user", "-created_at"], name="order_user_recent_idx"),
+            # The admin's status and date filters; also stale pending orders
+            models.Index(fields=["status", "created_at"], name="order_status_created_idx"),
+            # Only pending orders are polled/expired, and they are a small fraction of the table
+            models.Index(fields=["created_at"], condition=models.Q(status="pending"), name="order_pending_idx"),
+            # Paid orders in payment order, read by the analytics rollup from its checkpoint
+            models.Index(fields=["paid_at", "id"], condition=models.Q(status="paid"), name="order_paid_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Order #{self.id} - {self.status}"
 
 
+class CustomerOrderSummary(models.Model):
+    """Per-customer totals over paid orders, kept up to date by orders.history."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="order_summary")
+    order_count = models.PositiveIntegerField(default=0)
+    lifetime_spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    last_order_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "customer order summaries"
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.order_count} orders, {self.lifetime_spend}"
+
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
@@ -37,6 +66,10 @@ class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="carts")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized totals, kept up to date by orders.cart_service on every mutation
+    item_count = models.PositiveIntegerField(default=0)
+    line_count = models.PositiveIntegerField(default=0)
+    subtotal_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     class Meta:
         constraints = [
@@ -52,59 +85,32 @@ class Cart(models.Model):
         return cart
 
     def add_product(self, product: Product, quantity: int = 1) -> None:
-        if quantity <= 0:
-            return
-        item, created = CartItem.objects.get_or_create(
-            cart=self, product=product, defaults={"quantity": quantity, "unit_price": product.price}
-        )
-        if not created:
-            item.quantity += quantity
-            # Keep the last known product price as unit_price
-            item.unit_price = product.price
-            item.save()
+        from . import cart_service
+        cart_service.increment(self, product, quantity)
 
     def set_quantity(self, product: Product, quantity: int) -> None:
-        if quantity <= 0:
-            self.remove_product(product)
-            return
-        item, _ = CartItem.objects.get_or_create(
-            cart=self, product=product, defaults={"quantity": quantity, "unit_price": product.price}
-        )
-        item.quantity = quantity
-        item.unit_price = product.price
-        item.save()
+        from . import cart_service
+        cart_service.set_quantity(self, product, quantity)
 
     def remove_product(self, product: Product) -> None:
-        CartItem.objects.filter(cart=self, product=product).delete()
+        from . import cart_service
+        cart_service.remove(self, product)
 
     def clear(self) -> None:
-        self.items.all().delete()
+        from . import cart_service
+        cart_service.clear(self)
 
     def items_count(self) -> int:
-        return sum(i.quantity for i in self.items.all())
+        return self.item_count
 
     def subtotal(self):
-        from decimal import Decimal
-        total = Decimal("0.00")
-        for i in self.items.all():
-            total += i.unit_price * i.quantity
-        return total
+        return self.subtotal_amount
 
-    def to_order(self, user: User | None = None) -> Order:
+    def to_order(self, user: User | None = None) -> Order | None:
         """Create an Order snapshot from this cart and return it. Does not clear the cart."""
-        order = Order.objects.create(
-            user=user or self.user,
-            status="pending",
-            total_amount=self.subtotal(),
-        )
-        for item in self.items.select_related("product"):
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price=item.unit_price,
-            )
-        return order
+        from .checkout import place_order_from_cart
+        result = place_order_from_cart(self, user)
+        return result.order if result else None
 
 
 class CartItem(models.Model):
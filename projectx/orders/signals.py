@@ -0,0 +1,25 @@
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import Signal, receiver
+
+from . import cart_service, history
+from .cart_store import get_cart_store
+from .models import Cart
+
+# Sent inside the checkout transaction once an order is paid, with
+# ``order`` and ``lines`` (the ``(product, quantity, unit_price)`` tuples).
+order_paid = Signal()
+
+
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    if request is None:
+        return
+    store = get_cart_store(request)
+    if store:
+        cart_service.merge(Cart.get_for_user(user), store.items())
+        store.clear()
+
+
+@receiver(order_paid)
+def add_to_order_summary(sender, order, **kwargs):
+    history.record_paid(order)
@@ -0,0 +1,15 @@
+from jobs.queue import register
+
+from . import cart_service
+from .models import Cart
+
+
+@register('orders.clear_checked_out_cart')
+def clear_checked_out_cart(cart_id, quantities):
+    """Take the lines of a placed order out of the cart it was placed from.
+
+    Only the ordered quantities are removed, so items added after checkout stay.
+    """
+    cart = Cart.objects.filter(pk=cart_id).first()
+    if cart is not None:
+        cart_service.remove_quantities(cart, {int(pid): qty for pid, qty in quantities.items()})
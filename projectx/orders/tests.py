@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from inventory.models import StockLevel
+from products.models import Category, Product
+from projectx.testing import QueryBudgetTestCase
+
+from . import cart_service
+from .models import Cart, CustomerOrderSummary, Order
+
+
+class OrdersQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(slug='men', name='Men')
+        self.products = [
+            Product.objects.create(category=category, name=f'Shirt {i}', slug=f'shirt-{i}', price=Decimal('10.00'))
+            for i in range(3)
+        ]
+        StockLevel.objects.create(product=self.products[0], on_hand=100)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+        self.client.force_login(self.user)
+
+    def fill_cart(self):
+        cart = Cart.get_for_user(self.user)
+        for product in self.products:
+            cart_service.increment(cart, product, 2)
+
+    def test_checkout_start_first_order_with_tracked_stock(self):
+        self.fill_cart()
+        # The budget is for one tracked product; the untracked ones cost nothing extra.
+        response = self.assertWithinQueryBudget('orders:checkout_start', method='post')
+        self.assertRedirects(response, '/orders/checkout/success/', fetch_redirect_response=False)
+        self.assertEqual(CustomerOrderSummary.objects.get(user=self.user).order_count, 1)
+
+    def test_checkout_start_repeat_order(self):
+        for _ in range(2):
+            self.fill_cart()
+            self.assertWithinQueryBudget('orders:checkout_start', method='post')
+        self.assertEqual(Order.objects.filter(user=self.user, status='paid').count(), 2)
+
+    def test_checkout_pages(self):
+        self.assertWithinQueryBudget('orders:checkout_success')
+        self.assertWithinQueryBudget('orders:checkout_cancel')
+
+    def test_cart_summary(self):
+        self.fill_cart()
+        response = self.assertWithinQueryBudget('orders:cart_summary')
+        self.assertEqual(response.json()['item_count'], 6)
+        self.client.logout()
+        self.assertWithinQueryBudget('orders:cart_summary')
+
+    def test_order_history(self):
+        for _ in range(3):
+            self.fill_cart()
+            self.client.post('/orders/checkout/start/')
+        response = self.assertWithinQueryBudget('orders:order_history')
+        self.assertEqual(response.context['summary'].order_count, 3)
+        response = self.assertWithinQueryBudget('orders:order_history_api')
+        self.assertEqual(len(response.json()['orders']), 3)
@@ -7,6 +7,23 @@ urlpatterns = [
     path('checkout/start/', views.checkout_start, name='checkout_start'),
     path('checkout/success/', views.checkout_success, name='checkout_success'),
     path('checkout/cancel/', views.checkout_cancel, name='checkout_cancel'),
+    path('cart/summary/', views.cart_summary, name='cart_summary'),
+    path('history/', views.order_history, name='order_history'),
+    path('api/history/', views.order_history_api, name='order_history_api'),
 ]
 
-
+# Max queries per request (see projectx.instrumentation)
+QUERY_BUDGETS = {
+    # A customer's first order of one stock-tracked product: user, cart, BEGIN, cart lines,
+    # order, items, stock lookup, reservation (savepoint, UPDATE, INSERT, release), the
+    # summary UPDATE plus its first-order INSERT (in a savepoint), and three keyed job
+    # INSERTs in savepoints (stock commit, cart clearing, confirmation email).
+    # Each further stock-tracked product adds one UPDATE.
+    'checkout_start': 24,
+    'checkout_success': 7,
+    'checkout_cancel': 1,
+    'cart_summary': 2,
+    # Session, user, summary, orders and one prefetch for their items
+    'order_history': 5,
+    'order_history_api': 5,
+}
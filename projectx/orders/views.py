@@ -1,63 +1,49 @@
-from decimal import Decimal
 from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.views.decorators.http import require_POST
+from inventory.stock import OutOfStock
 from products.models import Product
-from .models import Order, OrderItem, Cart
+from . import cart_service, checkout, history
+from .cart_store import get_cart_store
+from .models import Cart
 
 
 def checkout_start(request):
-    # Build order items from session cart first (backwards compatible)
-    session_cart = request.session.get('cart', {})
-    items = []
-    total = Decimal('0.00')
-
-    if session_cart:
-        products = Product.objects.filter(id__in=session_cart.keys())
-        for product in products:
-            qty = int(session_cart.get(str(product.id), 0))
-            if qty > 0:
-                items.append((product, qty, product.price))
-                total += Decimal(qty) * product.price
-    elif request.user.is_authenticated:
-        # If no session cart, try database Cart for logged-in user
-        user_cart = Cart.get_for_user(request.user)
-        cart_items = list(user_cart.items.select_related('product'))
-        for ci in cart_items:
-            items.append((ci.product, ci.quantity, ci.unit_price))
-            total += ci.unit_price * ci.quantity
-
-    if not items:
+    user = request.user if request.user.is_authenticated else None
+    # Anonymous carts are merged into the DB cart on login, so a signed-in
+    # user always checks out from the DB cart.
+    store = get_cart_store(request)
+    result = None
+
+    # Stripe disabled: orders are marked as paid as part of the checkout transaction
+    try:
+        if user:
+            result = checkout.place_order_from_cart(Cart.get_for_user(user), user, mark_paid=True, clear_cart=True)
+        elif store:
+            quantities = store.items()
+            products = Product.objects.filter(id__in=quantities.keys())
+            lines = [(product, quantities.get(product.id, 0), product.price) for product in products]
+            result = checkout.place_order(None, lines, mark_paid=True)
+    except OutOfStock as e:
+        messages.error(request, str(e))
         return redirect('products:cart_view')
 
-    order = Order.objects.create(
-        user=request.user if request.user.is_authenticated else None,
-        total_amount=total,
-        status='pending',
-    )
-    for product, qty, price in items:
-        OrderItem.objects.create(order=order, product=product, quantity=qty, price=price)
-
-    # Stripe disabled: immediately mark as paid and redirect to success
-    order.status = 'paid'
-    order.save()
-    request.session['cart'] = {}
-    if request.user.is_authenticated:
-        try:
-            Cart.get_for_user(request.user).clear()
-        except Exception:
-            pass
-    return redirect('orders:checkout_success')
+    if result is None:
+        return redirect('products:cart_view')
+
+    # The DB cart is cleared by a job queued with the order (orders.tasks).
+    store.clear()
+    response = redirect('orders:checkout_success')
+    response['Server-Timing'] = result.server_timing()
+    return response
 
 
 def checkout_success(request):
-    request.session['cart'] = {}
-    if request.user.is_authenticated:
-        try:
-            Cart.get_for_user(request.user).clear()
-        except Exception:
-            pass
     return render(request, 'orders/checkout_success.html')
 
 
@@ -65,6 +51,43 @@ def checkout_cancel(request):
     return render(request, 'orders/checkout_cancel.html')
 
 
+def cart_summary(request):
+    """Cart badge data for the header and cart.js; never loads CartItems."""
+    if request.user.is_authenticated:
+        cart = Cart.objects.filter(user=request.user).only('item_count', 'line_count', 'subtotal_amount').first()
+        totals = cart_service.get_totals(cart) if cart else cart_service.EMPTY_TOTALS
+    else:
+        totals = cart_service.anonymous_totals(get_cart_store(request).items())
+    response = JsonResponse(totals.as_dict())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 from django.http import HttpResponse
 
 
+@login_required
+def order_history(request):
+    """'My orders': the customer's summary and a page of orders with their items."""
+    page = history.order_page(request.user, request.GET.get('cursor'))
+    response = render(request, 'orders/order_history.html', {
+        'summary': history.get_summary(request.user),
+        'orders': page.items,
+        'next_cursor': page.next_cursor,
+    })
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def order_history_api(request):
+    """The same as JSON; pass ``next_cursor`` back as ``?cursor=`` for the next page."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    page = history.order_page(request.user, request.GET.get('cursor'))
+    response = JsonResponse({
+        'summary': history.summary_as_dict(history.get_summary(request.user)),
+        'orders': [history.order_as_dict(order) for order in page.items],
+        'next_cursor': page.next_cursor,
+    })
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,146 @@
+"""
+Async versions of the read-heavy catalog views, used when the project runs
+under ASGI (``ASYNC_CATALOG_VIEWS``, switched on by projectx.asgi).
+
+They query through the async ORM, so a request waiting on the database or
+on a slow client doesn't hold a worker thread. Templates and
+``catalog_page`` read ``request.user``, the user's role and the session
+synchronously, so ``_loaded`` fetches those with the async APIs before the
+view runs. Rendering then needs no database access. Pages, templates and
+query counts are the same as in products.views.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.http import StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+
+from accounts.roles import aget_user_role
+from . import homepage
+from .conditional import acategory_state, ahome_state, aproduct_state, catalog_page
+from .models import Category, Product
+from .pagination import after_cursor, split_page
+from .views import (
+    CATEGORY_PAGE_SIZE, STREAM_CHUNK_SIZE, _category_products, _search_page, _stream_footer, _stream_shell,
+)
+
+
+def _loaded(view):
+    """Load the user, their role and the session up front so sync code can read them."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        request.user_role = await aget_user_role(request.user)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _fragment_cache():
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+async def _shelves_cached(site, version, path) -> bool:
+    """Whether every shelf fragment in home.html is cached, so the template won't need the shelves."""
+    keys = [
+        make_template_fragment_key('home_shelf', [slug, site, version, path])
+        for slug in homepage.HOMEPAGE_CATEGORIES
+    ]
+    return len(await _fragment_cache().aget_many(keys)) == len(keys)
+
+
+@_loaded
+@catalog_page(ahome_state)
+async def home(request):
+    site = request.get_host()
+    version = await homepage.aget_version()
+    shelves = None
+    if not await _shelves_cached(site, version, request.path):
+        shelves = await homepage.aget_shelves(site, version)
+    return render(request, 'home.html', {
+        'shelves': shelves,
+        'site': site,
+        'homepage_version': version,
+        'shelf_cache_timeout': homepage.CACHE_TIMEOUT,
+    })
+
+
+@_loaded
+@catalog_page(acategory_state)
+async def category_list(request, category_slug):
+    category = await aget_object_or_404(Category, slug=category_slug)
+    products = _category_products(category)
+    if getattr(settings, 'CATEGORY_STREAMING', False):
+        return _stream_category(request, category, products)
+    rows = [p async for p in after_cursor(products, request.GET.get('cursor'))[:CATEGORY_PAGE_SIZE + 1]]
+    page = split_page(rows, CATEGORY_PAGE_SIZE)
+    return render(request, 'products/category_list.html', {
+        'category': category,
+        'products': page.items,
+        'next_cursor': page.next_cursor,
+    })
+
+
+def _stream_category(request, category, products):
+    """products.views._stream_category, fed by an async iterator so no thread waits on the client."""
+    head, tail = _stream_shell(request, category)
+    rows = after_cursor(products, request.GET.get('cursor'))[:CATEGORY_PAGE_SIZE + 1]
+
+    def cards(batch):
+        return render_to_string('products/_product_cards.html', {'products': batch}, request=request)
+
+    async def chunks():
+        yield head
+        shown, last, has_more, batch = 0, None, False, []
+        async for product in rows.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+            if shown + len(batch) == CATEGORY_PAGE_SIZE:
+                has_more = True
+                break
+            batch.append(product)
+            if len(batch) == STREAM_CHUNK_SIZE:
+                shown, last = shown + len(batch), batch[-1]
+                yield cards(batch)
+                batch = []
+        if batch:
+            shown, last = shown + len(batch), batch[-1]
+            yield cards(batch)
+        yield _stream_footer(request, category, tail, shown, last, has_more)
+
+    return StreamingHttpResponse(chunks(), content_type='text/html; charset=utf-8')
+
+
+@_loaded
+@catalog_page(aproduct_state)
+async def product_detail(request, slug):
+    product = await aget_object_or_404(Product.objects.select_related('category'), slug=slug)
+    return render(request, 'products/product_detail.html', {
+        'product': product,
+    })
+
+
+def _evaluated_search_page(query, page_number):
+    page_obj = _search_page(query, page_number)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+@_loaded
+async def search(request):
+    query = request.GET.get('q', '').strip()
+    products = []
+    page_obj = None
+    if query:
+        # The FTS backend runs raw SQL, which has no async API: one thread hop for the whole page.
+        page_obj = await sync_to_async(_evaluated_search_page)(query, request.GET.get('page'))
+        products = page_obj.object_list
+    return render(request, 'products/search_results.html', {
+        'query': query,
+        'products': products,
+        'page_obj': page_obj,
+    })
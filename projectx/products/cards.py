@@ -0,0 +1,50 @@
+"""
+Product cards for listing pages.
+
+``render_cards`` (the ``{% product_cards %}`` tag) renders
+products/_product_card.html for a whole list at once. Each card is cached per product version: its
+``updated_at``, which image builds bump as well. The key also carries the
+``product-card`` namespace version, which tag changes bump (see
+products.signals). A page's cards are read with one ``get_many``, and only
+the missing ones are rendered and stored, with one ``set_many``. The
+add-to-cart ``next`` path differs from page to page, so cached cards hold a
+placeholder that is filled in afterwards.
+"""
+from caching.namespaces import Namespace
+from django.db.models import prefetch_related_objects
+from django.template.defaultfilters import urlencode
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+NAMESPACE = Namespace('product-card', alias='template_fragments')
+CACHE_TIMEOUT = 60 * 60
+NEXT_PATH = '__next_path__'
+
+
+def _card_key(product, variant: str, version: int) -> str:
+    updated = int(product.updated_at.timestamp() * 1_000_000) if product.updated_at else 0
+    return NAMESPACE.key(variant, product.pk, updated, version=version)
+
+
+def render_cards(products, next_path: str = '', tags: bool = False) -> str:
+    products = list(products)
+    if not products:
+        return ''
+    version = NAMESPACE.version()
+    keys = [_card_key(p, 'tags' if tags else 'plain', version) for p in products]
+    cards = NAMESPACE.cache.get_many(keys)
+    missing = {key: p for key, p in zip(keys, products) if key not in cards}
+    if missing:
+        if tags:
+            prefetch_related_objects(list(missing.values()), 'tags')
+        card = get_template('products/_product_card.html')
+        rendered = {key: card.render({'p': p, 'next_path': NEXT_PATH, 'show_tags': tags}) for key, p in missing.items()}
+        NAMESPACE.cache.set_many(rendered, CACHE_TIMEOUT)
+        cards.update(rendered)
+    html = ''.join(cards[key] for key in keys)
+    return mark_safe(html.replace(NEXT_PATH, conditional_escape(urlencode(next_path))))
+
+
+def invalidate() -> None:
+    NAMESPACE.bump()
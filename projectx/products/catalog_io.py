@@ -0,0 +1,252 @@
+"""
+Streaming catalog import/export (CSV or JSON Lines).
+
+One row per product::
+
+    slug,name,category,price,description,tags,image
+    mens-shirt,Men's Shirt,men,29.99,...,classic|sale,products/menshirt.png
+
+``tags`` is a ``|``-separated string in CSV and a list in JSONL. ``image``
+is optional. When it is given it must name a file that already exists in
+media storage; when it is missing or blank, an existing product keeps its
+image.
+
+Rows are read and written one at a time and imported in batches. Each batch
+is two slug lookups (before and after), an upsert on Product.slug (two when
+only some rows name a new image), and one delete plus one bulk insert of the
+batch's tag rows. Categories and tags are resolved from in-memory slug maps,
+and missing ones are created once per batch. Memory use doesn't grow with
+the file.
+
+A new image empties the product's ``image_derivatives``, and ``on_batch``
+gets the ids of those products so their derivatives can be rebuilt
+(bulk_create sends no post_save).
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from . import images
+from .models import Category, Product, Tag
+
+FIELDS = ('slug', 'name', 'category', 'price', 'description', 'tags', 'image')
+REQUIRED = ('slug', 'name', 'category', 'price')
+TAG_SEPARATOR = '|'
+FORMATS = ('csv', 'jsonl')
+
+
+class RowError(ValueError):
+    pass
+
+
+def guess_format(path: str, default: str = 'csv') -> str:
+    for fmt in FORMATS:
+        if path.endswith(f'.{fmt}'):
+            return fmt
+    return 'jsonl' if path.endswith('.ndjson') else default
+
+
+def read_rows(stream, fmt: str):
+    """Yield ``(line_number, row_dict)`` from a CSV or JSONL text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            tags = row.get('tags') or ''
+            row['tags'] = [t.strip() for t in tags.split(TAG_SEPARATOR) if t.strip()]
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, RowError(f'invalid JSON: {e}')
+                    continue
+                yield line_number, row if isinstance(row, dict) else RowError('row must be a JSON object')
+
+
+def export_rows(batch_size: int = 1000):
+    """Every product as an export row, in id order, ``batch_size`` at a time."""
+    products = (
+        Product.objects.select_related('category').prefetch_related('tags').order_by('id')
+        .iterator(chunk_size=batch_size)
+    )
+    for p in products:
+        yield {
+            'slug': p.slug,
+            'name': p.name,
+            'category': p.category.slug,
+            'price': str(p.price),
+            'description': p.description,
+            'tags': sorted(t.slug for t in p.tags.all()),
+            'image': p.image.name or '',
+        }
+
+
+def write_rows(stream, fmt: str, rows) -> int:
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'tags': TAG_SEPARATOR.join(row['tags'])})
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+
+class CatalogImporter:
+    """Upsert products ``batch_size`` rows at a time; see the module docstring."""
+
+    def __init__(self, batch_size: int = 1000, on_batch=None):
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.stats = ImportStats()
+
+    def run(self, numbered_rows) -> ImportStats:
+        batch = {}
+        for line_number, row in numbered_rows:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                clean = self.clean(row)
+            except RowError as e:
+                self.stats.errors.append((line_number, str(e)))
+                continue
+            # A slug repeated within one batch would hit the same row twice in one upsert; last one wins.
+            batch[clean['slug']] = clean
+            if len(batch) >= self.batch_size:
+                self.import_batch(list(batch.values()))
+                batch = {}
+        if batch:
+            self.import_batch(list(batch.values()))
+        return self.stats
+
+    def clean(self, row: dict) -> dict:
+        missing = [name for name in REQUIRED if not str(row.get(name) or '').strip()]
+        if missing:
+            raise RowError(f'missing {", ".join(missing)}')
+        try:
+            price = Decimal(str(row['price']).strip())
+        except InvalidOperation:
+            raise RowError(f'invalid price {row["price"]!r}')
+        if price < 0 or price.as_tuple().exponent < -2:
+            raise RowError(f'invalid price {row["price"]!r}')
+        tags = row.get('tags') or []
+        if isinstance(tags, str):
+            tags = tags.split(TAG_SEPARATOR)
+        category = str(row['category']).strip()
+        tags = [str(t).strip() for t in tags if str(t).strip()]
+        # Categories and tags are found and created by slug, and a blank one can't be linked to.
+        for name in (category, *tags):
+            if not slugify(name):
+                raise RowError(f'{name!r} has no usable slug')
+        return {
+            'slug': str(row['slug']).strip(),
+            'name': str(row['name']).strip(),
+            'category': category,
+            'price': price,
+            'description': row.get('description') or '',
+            'tags': tags,
+            # A blank cell means "keep the current image", like a missing column
+            'image': str(row.get('image') or '').strip() or None,
+        }
+
+    def _ensure(self, model, known: dict, names) -> None:
+        """Create the categories/tags in ``names`` that aren't in ``known`` yet."""
+        missing = {slugify(name): name for name in names if slugify(name) not in known}
+        if not missing:
+            return
+        model.objects.bulk_create(
+            [model(slug=slug, name=name.replace('-', ' ').title() if name == slug else name)
+             for slug, name in missing.items()],
+            ignore_conflicts=True,
+        )
+        known.update(model.objects.filter(slug__in=missing).values_list('slug', 'id'))
+        # Names are unique too: a new slug whose name is taken maps onto that row.
+        by_name = {name: slug for slug, name in missing.items() if slug not in known}
+        for name, pk in model.objects.filter(name__in=by_name).values_list('name', 'id'):
+            known[by_name[name]] = pk
+
+    @staticmethod
+    def _delete_derivatives(stale: list) -> None:
+        storage = Product._meta.get_field('image').storage
+        for derivatives in stale:
+            images.delete_files(storage, derivatives)
+
+    def import_batch(self, rows: list) -> None:
+        with transaction.atomic():
+            self._ensure(Category, self.categories, {r['category'] for r in rows})
+            self._ensure(Tag, self.tags, {t for r in rows for t in r['tags']})
+
+            slugs = [r['slug'] for r in rows]
+            existing = {
+                slug: (image or '', derivatives)
+                for slug, image, derivatives in Product.objects.filter(slug__in=slugs)
+                .values_list('slug', 'image', 'image_derivatives')
+            }
+            update_fields = ['name', 'category', 'price', 'description', 'updated_at']
+            # Only rows that name a different image replace the product's image and its
+            # derivatives, so those are upserted apart.
+            new_image = [r for r in rows if r['image'] and r['image'] != existing.get(r['slug'], ('',))[0]]
+            replaced = {r['slug'] for r in new_image}
+            same_image = [r for r in rows if r['slug'] not in replaced]
+            for group, fields in (
+                (new_image, update_fields + ['image', 'image_derivatives']),
+                (same_image, update_fields),
+            ):
+                if not group:
+                    continue
+                Product.objects.bulk_create(
+                    [
+                        Product(
+                            slug=r['slug'], name=r['name'], category_id=self.categories[slugify(r['category'])],
+                            price=r['price'], description=r['description'], image=r['image'] or '',
+                            image_derivatives={},
+                        )
+                        for r in group
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['slug'],
+                    update_fields=fields,
+                )
+            # Not every backend returns ids from an upsert, so look them up by slug.
+            ids = dict(Product.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+            # The replaced images' derivatives are no longer referenced by any row.
+            stale = [existing[slug][1] for slug in replaced if slug in existing and existing[slug][1]]
+            if stale:
+                transaction.on_commit(lambda: self._delete_derivatives(stale))
+
+            through = Product.tags.through
+            through.objects.filter(product_id__in=ids.values()).delete()
+            through.objects.bulk_create(
+                [
+                    through(product_id=ids[r['slug']], tag_id=tag_id)
+                    for r in rows
+                    for tag_id in {self.tags[slugify(t)] for t in r['tags']}
+                ],
+                ignore_conflicts=True,
+            )
+
+        self.stats.rows += len(rows)
+        self.stats.updated += len(existing)
+        self.stats.created += len(rows) - len(existing)
+        if self.on_batch:
+            self.on_batch(list(ids.values()), [ids[r['slug']] for r in new_image], self.stats)
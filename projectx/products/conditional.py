@@ -0,0 +1,200 @@
+"""
+Conditional GET support for catalog pages.
+
+Each page has a state function that reads a few cheap aggregates (latest
+``updated_at`` and row counts, so deletions change the state too). The
+``catalog_page`` decorator turns that state into ``ETag`` and
+``Last-Modified``. When the client already has the current version it
+answers 304 without running the view. Anonymous responses are marked
+``public`` so a reverse proxy can share them. Logged-in responses stay
+``private``, and every response varies on ``Cookie``.
+
+``updated_at`` is ``auto_now``, so anything that changes a product or
+category through ``queryset.update()`` must set it explicitly.
+
+The ``a*_state`` functions are the async ORM versions used by
+products.async_views. ``catalog_page`` wraps sync and async views alike.
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from . import homepage
+from .models import Category, Product
+
+
+@dataclass(frozen=True)
+class PageState:
+    last_modified: datetime | None
+    key: tuple
+
+
+def _latest(*timestamps):
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def _home_last_modified():
+    products = Product.objects.filter(category__slug__in=homepage.HOMEPAGE_CATEGORIES)
+    return _latest(
+        products.aggregate(latest=Max('updated_at'))['latest'],
+        Category.objects.aggregate(latest=Max('updated_at'))['latest'],
+    )
+
+
+async def _ahome_last_modified():
+    products = Product.objects.filter(category__slug__in=homepage.HOMEPAGE_CATEGORIES)
+    latest_product, latest_category = await asyncio.gather(
+        products.aaggregate(latest=Max('updated_at')),
+        Category.objects.aaggregate(latest=Max('updated_at')),
+    )
+    return _latest(latest_product['latest'], latest_category['latest'])
+
+
+def home_state(request):
+    # Everything on the homepage is covered by the homepage version, so the
+    # aggregates are computed once per version and the warm path stays query-free.
+    version = homepage.get_version()
+    last_modified = homepage.NAMESPACE.fetch(
+        ('last_modified',), _home_last_modified, homepage.CACHE_TIMEOUT, version=version,
+    )
+    return PageState(last_modified=last_modified, key=('home', version))
+
+
+async def ahome_state(request):
+    version = await homepage.aget_version()
+    last_modified = await homepage.NAMESPACE.afetch(
+        ('last_modified',), _ahome_last_modified, homepage.CACHE_TIMEOUT, version=version,
+    )
+    return PageState(last_modified=last_modified, key=('home', version))
+
+
+def _category_row(category_slug):
+    return Category.objects.filter(slug=category_slug).annotate(
+        products_updated=Max('products__updated_at'), product_count=Count('products'),
+    ).values('id', 'updated_at', 'products_updated', 'product_count')
+
+
+def _category_page_state(request, row):
+    if row is None:
+        return None
+    return PageState(
+        last_modified=_latest(row['updated_at'], row['products_updated']),
+        key=('category', row['id'], row['product_count'], request.GET.get('cursor', '')),
+    )
+
+
+def category_state(request, category_slug):
+    return _category_page_state(request, _category_row(category_slug).first())
+
+
+async def acategory_state(request, category_slug):
+    return _category_page_state(request, await _category_row(category_slug).afirst())
+
+
+def _product_row(slug):
+    return Product.objects.filter(slug=slug).values('id', 'updated_at', 'category__updated_at')
+
+
+def _product_page_state(row):
+    if row is None:
+        return None
+    return PageState(
+        last_modified=_latest(row['updated_at'], row['category__updated_at']),
+        key=('product', row['id']),
+    )
+
+
+def product_state(request, slug):
+    return _product_page_state(_product_row(slug).first())
+
+
+async def aproduct_state(request, slug):
+    return _product_page_state(await _product_row(slug).afirst())
+
+
+def _viewer(request):
+    """The part of the page that depends on who is looking at it (the navbar)."""
+    if not request.user.is_authenticated:
+        return ('anonymous',)
+    return (request.user.pk, request.user.is_superuser, request.user_role.is_admin)
+
+
+def _has_messages(request) -> bool:
+    # len() loads pending messages without marking them as shown.
+    return len(get_messages(request)) > 0
+
+
+def _validators(view, request, state):
+    """``(etag, last_modified timestamp)`` for ``state`` as seen by this viewer."""
+    etag = quote_etag(hashlib.md5(
+        repr((view.__name__, _viewer(request), state.key, state.last_modified)).encode()
+    ).hexdigest())
+    last_modified = int(state.last_modified.timestamp()) if state.last_modified else None
+    return etag, last_modified
+
+
+def _not_cacheable(response):
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _add_headers(request, response, etag, last_modified):
+    if response.status_code not in (200, 304):
+        return response
+    response.headers.setdefault('ETag', etag)
+    if last_modified and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
+    if _viewer(request) == ('anonymous',):
+        patch_cache_control(response, public=True, max_age=settings.CATALOG_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def catalog_page(state_func):
+    """Answer conditional GETs for a view from ``state_func(request, *args, **kwargs)``.
+
+    A state of None (e.g. unknown slug) skips the checks so the view can 404.
+    Async views need an async ``state_func``, and ``request.user`` must
+    already be loaded (see products.async_views).
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or _has_messages(request):
+                    return _not_cacheable(await view(request, *args, **kwargs))
+                state = await state_func(request, *args, **kwargs)
+                if state is None:
+                    return await view(request, *args, **kwargs)
+                etag, last_modified = _validators(view, request, state)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _add_headers(request, response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_messages(request):
+                return _not_cacheable(view(request, *args, **kwargs))
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            etag, last_modified = _validators(view, request, state)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _add_headers(request, response, etag, last_modified)
+        return wrapper
+    return decorator
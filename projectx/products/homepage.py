@@ -0,0 +1,65 @@
+"""
+Homepage data provider.
+
+All shelves come from one windowed query and are cached in the
+``homepage`` namespace, whose version is bumped whenever a Product,
+Category or Tag changes (see products.signals). The same version keys the
+rendered shelf fragments in home.html, so a warm homepage needs no database
+queries at all. When the shelves expire or the version changes, one
+request reloads them while the others wait or serve the old ones.
+"""
+from caching.namespaces import Namespace
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Product
+
+HOMEPAGE_CATEGORIES = ('children', 'men', 'women')
+SHELF_SIZE = 4
+CACHE_TIMEOUT = 60 * 10
+NAMESPACE = Namespace('homepage')
+
+
+def get_version() -> int:
+    return NAMESPACE.version()
+
+
+async def aget_version() -> int:
+    return await NAMESPACE.aversion()
+
+
+def invalidate() -> None:
+    NAMESPACE.bump()
+
+
+def shelves_queryset(limit: int = SHELF_SIZE):
+    """Top ``limit`` products of every homepage category in a single query."""
+    return (
+        Product.objects.filter(category__slug__in=HOMEPAGE_CATEGORIES)
+        .select_related('category')
+        .annotate(shelf_rank=Window(RowNumber(), partition_by=F('category_id'), order_by=F('id').asc()))
+        .filter(shelf_rank__lte=limit)
+        .order_by('category_id', 'shelf_rank')
+    )
+
+
+def load_shelves(limit: int = SHELF_SIZE) -> dict:
+    shelves = {slug: [] for slug in HOMEPAGE_CATEGORIES}
+    for product in shelves_queryset(limit):
+        shelves[product.category.slug].append(product)
+    return shelves
+
+
+async def aload_shelves(limit: int = SHELF_SIZE) -> dict:
+    shelves = {slug: [] for slug in HOMEPAGE_CATEGORIES}
+    async for product in shelves_queryset(limit):
+        shelves[product.category.slug].append(product)
+    return shelves
+
+
+def get_shelves(site: str, version: int | None = None) -> dict:
+    return NAMESPACE.fetch(('shelves', site), load_shelves, CACHE_TIMEOUT, version=version)
+
+
+async def aget_shelves(site: str, version: int) -> dict:
+    return await NAMESPACE.afetch(('shelves', site), aload_shelves, CACHE_TIMEOUT, version=version)
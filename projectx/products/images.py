@@ -0,0 +1,208 @@
+"""
+Responsive image derivatives for Product.image.
+
+Whenever a product's image changes, a background thread renders it at the
+thumb, card and detail widths, once in every modern format Pillow can write
+(AVIF, WebP) and once in a fallback format every browser can show (the
+upload's own format when that is JPEG or PNG). The file names are stored in
+``Product.image_derivatives``::
+
+    {"source": "products/shoe.png", "fallback": "png",
+     "formats": {"webp": [[192, "products/derivatives/shoe-192w.webp", 5120], ...], ...}}
+
+Templates render them through the ``product_picture`` tag (see
+products.templatetags.product_images) as a ``<picture>`` with a srcset per
+format, so browsers download a few KB instead of the full upload.
+
+Products without an upload fall back to a bundled static image picked by
+slug (``STATIC_FALLBACKS``, also what seed_demo uploads). ``image_url``
+resolves all of this with dictionary lookups: the static URLs are computed
+once per process and media URLs are built from MEDIA_URL without asking the
+storage backend.
+"""
+import io
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Q
+from django.templatetags.static import static
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+SIZES = {'thumb': 192, 'card': 480, 'detail': 1024}
+# Value of the <img sizes> attribute for each slot a product image is shown in.
+SLOT_SIZES = {
+    'thumb': '80px',
+    'card': '(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw',
+    'detail': '(min-width: 768px) 50vw, 100vw',
+}
+# Preferred first; only the ones this Pillow build can encode.
+MODERN_FORMATS = tuple(fmt for fmt in ('avif', 'webp') if features.check(fmt))
+FALLBACK_FORMATS = ('jpeg', 'png')
+QUALITY = {'avif': 60, 'webp': 80, 'jpeg': 82}
+EXTENSIONS = {'jpeg': 'jpg'}
+DERIVATIVES_DIR = 'products/derivatives'
+PLACEHOLDER = 'placeholder.png'
+# Bundled images for the demo catalogue, by product slug.
+STATIC_FALLBACKS = {
+    'kids-shoe': 'kids_shoe.png',
+    'kids-hat': 'kids_hat.png',
+    'kids-jacket': 'kids_jacket.png',
+    'kids-tshirt': 'kids_tshirt.png',
+    'kids-backpack': 'kids_backpack.png',
+    'mens-shirt': 'menshirt.png',
+    'mens-hoodie': 'menshoodie.png',
+    'mens-sneaker': 'mensneaker.jpg',
+    'mens-pant': 'menspant.jpg',
+    'mens-watch': 'menwatch.png',
+    'womens-dress': 'womens_dress.png',
+}
+
+_executor = None
+
+
+def mime_type(fmt: str) -> str:
+    return f'image/{fmt}'
+
+
+def media_url(name: str) -> str:
+    return f'{settings.MEDIA_URL}{filepath_to_uri(name)}'
+
+
+@lru_cache(maxsize=None)
+def static_urls() -> dict:
+    """``{slug: url}`` for STATIC_FALLBACKS plus the placeholder under ``None``."""
+    urls = {slug: static(filename) for slug, filename in STATIC_FALLBACKS.items()}
+    urls[None] = static(PLACEHOLDER)
+    return urls
+
+
+def image_url(product) -> str:
+    """The uploaded image, else the bundled image for the slug, else the placeholder."""
+    if product.image:
+        return media_url(product.image.name)
+    urls = static_urls()
+    return urls.get(product.slug) or urls[None]
+
+
+def srcset(derivatives: dict, fmt: str) -> str:
+    return ', '.join(f'{media_url(name)} {width}w' for width, name, _ in derivatives.get('formats', {}).get(fmt, []))
+
+
+def variant_url(derivatives: dict, size: str):
+    """URL of the smallest fallback-format variant at least as wide as ``size``."""
+    variants = derivatives.get('formats', {}).get(derivatives.get('fallback'), [])
+    if not variants:
+        return None
+    wanted = SIZES[size]
+    return media_url(next((v for v in variants if v[0] >= wanted), variants[-1])[1])
+
+
+def sources(derivatives: dict) -> list:
+    """``[{'type': ..., 'srcset': ...}]`` for the modern formats, best first."""
+    formats = derivatives.get('formats', {})
+    return [{'type': mime_type(fmt), 'srcset': srcset(derivatives, fmt)} for fmt in MODERN_FORMATS if fmt in formats]
+
+
+def _encode(image, fmt: str) -> bytes:
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY.get(fmt, 80), optimize=fmt in ('jpeg', 'png'))
+    return buffer.getvalue()
+
+
+def render(image_field) -> dict:
+    """Write every derivative of ``image_field`` to storage and describe them."""
+    storage = image_field.storage
+    stem = posixpath.splitext(posixpath.basename(image_field.name))[0]
+    with image_field.open('rb'), Image.open(image_field) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        fallback = (source.format or '').lower()
+        if fallback not in FALLBACK_FORMATS:
+            fallback = 'png' if image.mode == 'RGBA' else 'jpeg'
+        # Never upscale: sizes wider than the upload collapse into one at its own width.
+        widths = sorted({min(width, image.width) for width in SIZES.values()})
+        formats = {}
+        for width in widths:
+            resized = image if width == image.width else image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.LANCZOS
+            )
+            for out in (*MODERN_FORMATS, fallback):
+                data = _encode(resized, out)
+                name = storage.save(
+                    f'{DERIVATIVES_DIR}/{stem}-{width}w.{EXTENSIONS.get(out, out)}', ContentFile(data)
+                )
+                formats.setdefault(out, []).append([width, name, len(data)])
+    return {'source': image_field.name, 'fallback': fallback, 'formats': formats}
+
+
+def delete_files(storage, derivatives: dict, keep: dict | None = None) -> None:
+    keep_names = {name for variants in (keep or {}).get('formats', {}).values() for _, name, _ in variants}
+    for variants in derivatives.get('formats', {}).values():
+        for _, name, _ in variants:
+            if name not in keep_names:
+                storage.delete(name)
+
+
+def build(product_id) -> dict | None:
+    """Render the derivatives of one product and store them; returns the new map."""
+    from . import homepage
+    from .models import Product
+
+    product = Product.objects.filter(pk=product_id).only('id', 'image', 'image_derivatives').first()
+    if product is None:
+        return None
+    old = product.image_derivatives or {}
+    new = render(product.image) if product.image else {}
+    # Only store the result if the image wasn't replaced while we were rendering.
+    unchanged = Q(image=product.image.name) if product.image else Q(image='') | Q(image__isnull=True)
+    if Product.objects.filter(unchanged, pk=product_id).update(image_derivatives=new, updated_at=timezone.now()):
+        delete_files(product.image.storage, old, keep=new)
+        homepage.invalidate()
+        return new
+    delete_files(product.image.storage, new)
+    return None
+
+
+def needs_build(product) -> bool:
+    return (product.image.name or '') != (product.image_derivatives or {}).get('source', '')
+
+
+def _build_in_worker(product_id) -> None:
+    try:
+        build(product_id)
+    except Exception:
+        logger.exception('Could not build image derivatives for product %s', product_id)
+    finally:
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PRODUCT_IMAGE_WORKERS', 2), thread_name_prefix='image-derivatives'
+        )
+    return _executor
+
+
+def schedule(product_id) -> None:
+    """Build the derivatives once the current transaction commits, off the request thread.
+
+    With ``PRODUCT_IMAGE_WORKERS = 0`` they are built inline instead.
+    """
+    if getattr(settings, 'PRODUCT_IMAGE_WORKERS', 2) == 0:
+        transaction.on_commit(lambda: build(product_id))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_build_in_worker, product_id))
@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from products.models import Category, Product
+
+SEARCH_TERMS = ('shirt', 'blue denim', 'sneak', 'leather jacket', 'summer', 'black watch')
+MODES = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the catalog pages (home, category, product, search) under WSGI and under ASGI with "
+        "slow clients. Both handlers are driven in-process, each in its own subprocess, and a client "
+        "reads the response at --client-kbps, holding a WSGI worker thread for as long as that takes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=64, help="Concurrent client connections")
+        parser.add_argument('--requests', type=int, default=400, help="Timed requests per mode")
+        parser.add_argument('--wsgi-threads', type=int, default=8, help="WSGI worker threads (e.g. gunicorn --threads)")
+        parser.add_argument('--client-kbps', type=float, default=100.0, help="Client download speed in KB/s; 0 = fast")
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+        parser.add_argument('--seed', type=int, default=42)
+        # Internal: run one mode in this process and print its results as JSON.
+        parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['run']:
+            self.stdout.write(json.dumps(self._run(options['run'], options)))
+            return
+        results = {mode: self._spawn(mode, options) for mode in options['modes']}
+        self.stdout.write(
+            f"{options['clients']} clients at "
+            f"{options['client_kbps'] or 'unlimited'} KB/s, {options['wsgi_threads']} WSGI threads"
+        )
+        self.stdout.write(f"{'mode':6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for mode, r in results.items():
+            self.stdout.write(
+                f"{mode:6} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['errors']:7}"
+            )
+        if len(results) == 2:
+            self.stdout.write(f"ASGI/WSGI throughput: {results['asgi']['rps'] / results['wsgi']['rps']:.2f}x")
+
+    def _spawn(self, mode, options):
+        # The URLconf picks sync or async views at import time, so each mode gets a fresh process.
+        env = {**os.environ, 'ASYNC_CATALOG_VIEWS': '1' if mode == 'asgi' else '0'}
+        command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_asgi', '--run', mode]
+        for name in ('clients', 'requests', 'wsgi_threads', 'client_kbps', 'warmup', 'seed'):
+            command += [f"--{name.replace('_', '-')}", str(options[name])]
+        proc = subprocess.run(command, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{mode} run failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def _urls(self, count, seed):
+        rng = random.Random(seed)
+        categories = list(Category.objects.values_list('slug', flat=True))
+        products = list(Product.objects.order_by('?').values_list('slug', flat=True)[:500])
+        if not categories or not products:
+            raise CommandError("No products found; run seed_demo or generate_load_data first.")
+        pages = [
+            lambda: reverse('products:home'),
+            lambda: reverse('products:category_list', args=[rng.choice(categories)]),
+            lambda: reverse('products:product_detail', args=[rng.choice(products)]),
+            lambda: f"{reverse('products:search')}?q={rng.choice(SEARCH_TERMS)}",
+        ]
+        return [rng.choice(pages)() for _ in range(count)]
+
+    def _run(self, mode, options):
+        urls = self._urls(options['warmup'] + options['requests'], options['seed'])
+        warmup, timed = urls[:options['warmup']], urls[options['warmup']:]
+        rate = options['client_kbps'] * 1024
+        run = self._run_wsgi if mode == 'wsgi' else self._run_asgi
+        run(warmup, 1, rate=0, threads=options['wsgi_threads'])
+        started = time.perf_counter()
+        samples = run(timed, options['clients'], rate=rate, threads=options['wsgi_threads'])
+        elapsed = time.perf_counter() - started
+        ms = sorted(latency for latency, status in samples)
+        cuts = statistics.quantiles(ms, n=100, method='inclusive')
+        return {
+            'rps': len(samples) / elapsed,
+            'p50_ms': statistics.median(ms),
+            'p95_ms': cuts[94],
+            'p99_ms': cuts[98],
+            'errors': sum(1 for _, status in samples if status >= 500),
+        }
+
+    def _run_wsgi(self, urls, clients, rate, threads):
+        from django.core.wsgi import get_wsgi_application
+        from django.test import RequestFactory
+
+        app = get_wsgi_application()
+        factory = RequestFactory()
+        workers = threading.BoundedSemaphore(threads)
+        pending = iter(urls)
+        lock = threading.Lock()
+        samples = []
+
+        def client():
+            while True:
+                with lock:
+                    url = next(pending, None)
+                if url is None:
+                    return
+                started = time.perf_counter()
+                # A sync server has ``threads`` workers; each stays busy until the client has read everything.
+                with workers:
+                    environ = factory.get(url, HTTP_HOST='localhost').environ
+                    status = []
+                    body = app(environ, lambda s, headers, exc_info=None: status.append(int(s.split()[0])))
+                    try:
+                        for chunk in body:
+                            if rate:
+                                time.sleep(len(chunk) / rate)
+                    finally:
+                        body.close()
+                with lock:
+                    samples.append(((time.perf_counter() - started) * 1000, status[0]))
+
+        pool = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return samples
+
+    def _run_asgi(self, urls, clients, rate, threads):
+        from django.core.asgi import get_asgi_application
+
+        app = get_asgi_application()
+
+        async def request(url):
+            parts = urlsplit(url)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': parts.path, 'raw_path': parts.path.encode(),
+                'query_string': parts.query.encode(), 'root_path': '', 'headers': [(b'host', b'localhost')],
+                'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+            }
+            sent = asyncio.Event()
+            received = False
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await sent.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif message['type'] == 'http.response.body':
+                    if rate:
+                        # The slow client: the event loop serves other requests meanwhile.
+                        await asyncio.sleep(len(message.get('body', b'')) / rate)
+                    if not message.get('more_body'):
+                        sent.set()
+
+            await app(scope, receive, send)
+            return status[0]
+
+        async def main():
+            pending = iter(urls)
+            samples = []
+
+            async def client():
+                for url in pending:
+                    started = time.perf_counter()
+                    status = await request(url)
+                    samples.append(((time.perf_counter() - started) * 1000, status))
+
+            await asyncio.gather(*(client() for _ in range(clients)))
+            return samples
+
+        return asyncio.run(main())
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products.models import Category, Product, Tag
+from products.search import ORMSearchBackend, SQLiteFTSBackend
+
+
+WORDS = (
+    "shirt pant sneaker watch hoodie dress bag heels top jacket shoe hat backpack cotton denim "
+    "leather wool linen summer winter classic casual formal sport kids men women red blue black "
+    "white green slim regular oversized premium organic vintage striped plain printed waterproof"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Compare the ORM icontains search with the FTS5 index on a synthetic catalog (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=24)
+        parser.add_argument('queries', nargs='*', default=['sneaker', 'blue denim', 'win', 'leather jacket'])
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._seed(options['products'])
+            backends = [('orm', ORMSearchBackend()), ('fts5', SQLiteFTSBackend())]
+            for query in options['queries']:
+                for label, backend in backends:
+                    timings = self._time(backend, query, options['repeat'], options['page_size'])
+                    self.stdout.write(
+                        f"{query!r:20} {label:5} hits={timings['hits']:>7} "
+                        f"p50={timings['p50']:8.2f}ms p95={timings['p95']:8.2f}ms"
+                    )
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        rng = random.Random(42)
+        started = time.perf_counter()
+        category = Category.objects.create(slug='bench-search', name='Bench search')
+        tags = Tag.objects.bulk_create([Tag(name=f'bench-{w}', slug=f'bench-{w}') for w in WORDS[:12]])
+        products = Product.objects.bulk_create(
+            (
+                Product(
+                    category=category,
+                    name=' '.join(rng.choices(WORDS, k=3)).title(),
+                    slug=f'bench-search-{i}',
+                    description=' '.join(rng.choices(WORDS, k=25)),
+                    price=rng.randint(100, 20000) / 100,
+                )
+                for i in range(count)
+            ),
+            batch_size=2000,
+        )
+        Through = Product.tags.through
+        Through.objects.bulk_create(
+            (Through(product_id=p.id, tag_id=rng.choice(tags).id) for p in products),
+            batch_size=5000,
+        )
+        SQLiteFTSBackend().rebuild()
+        self.stdout.write(f"Seeded {count} products in {time.perf_counter() - started:.1f}s")
+
+    def _time(self, backend, query, repeat, page_size):
+        samples = []
+        hits = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = backend.search(query)
+            hits = results.count()
+            list(results[:page_size])
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        return {
+            'hits': hits,
+            'p50': statistics.median(samples),
+            'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
@@ -0,0 +1,59 @@
+import statistics
+import time
+from itertools import cycle, islice
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template import RequestContext, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils.safestring import mark_safe
+from products import cards
+from products.models import Category, Product
+
+# The listing before {% product_cards %}: every card rendered by its own include.
+CARD_LOOP = Template(
+    "{% for p in products %}{% include 'products/_product_card.html' with next_path=request.path %}{% endfor %}"
+)
+MODES = ('include loop', 'cards cold', 'cards warm')
+
+
+class Command(BaseCommand):
+    help = (
+        "Time full category page renders at 20, 200 and 2000 product cards: a per-card include loop, "
+        "{% product_cards %} with an empty card cache, and {% product_cards %} with every card cached."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[20, 200, 2000])
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.select_related('category').order_by('id')[:max(options['sizes'])])
+        if not products:
+            raise CommandError("No products found; run seed_demo or generate_load_data first.")
+        category = products[0].category or Category.objects.first()
+        request = RequestFactory().get(f'/category/{category.slug}/', HTTP_HOST='localhost')
+        request.user = AnonymousUser()
+        self.stdout.write(f"{'cards':>6} " + ' '.join(f'{mode:>14}' for mode in MODES) + "   (p50 ms per page)")
+        for size in options['sizes']:
+            # Fewer products than cards: the same products repeat, as the cache would see them.
+            page = list(islice(cycle(products), size))
+            timings = {mode: [] for mode in MODES}
+            for _ in range(options['repeat']):
+                timings['include loop'].append(self._time(request, category, page, loop=True))
+                cards.invalidate()
+                timings['cards cold'].append(self._time(request, category, page))
+                timings['cards warm'].append(self._time(request, category, page))
+            self.stdout.write(
+                f"{size:6} " + ' '.join(f'{statistics.median(timings[mode]):14.2f}' for mode in MODES)
+            )
+
+    def _time(self, request, category, page, loop=False) -> float:
+        started = time.perf_counter()
+        context = {'category': category, 'products': page}
+        if loop:
+            # Rendered into the page the way streaming does, so both modes share the page shell.
+            context['stream_items'] = mark_safe(CARD_LOOP.render(RequestContext(request, {'products': page})))
+        render_to_string('products/category_list.html', context, request=request)
+        return (time.perf_counter() - started) * 1000
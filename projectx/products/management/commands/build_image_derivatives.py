@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from products import images
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Build the resized product image copies that are missing or out of date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild every product, even if up to date")
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_derivatives')
+        built = original_bytes = card_bytes = 0
+        for product in products.iterator():
+            if not options['force'] and not images.needs_build(product):
+                continue
+            derivatives = images.build(product.pk)
+            if not derivatives:
+                continue
+            built += 1
+            original_bytes += product.image.size
+            # What a card actually downloads: the best format at card width.
+            fmt = next(iter(images.MODERN_FORMATS), derivatives['fallback'])
+            card = next(
+                (v for v in derivatives['formats'][fmt] if v[0] >= images.SIZES['card']), derivatives['formats'][fmt][-1]
+            )
+            card_bytes += card[2]
+            self.stdout.write(f"{product.image.name}: {product.image.size // 1024} KB -> {card[2] // 1024} KB card ({fmt})")
+
+        if built:
+            self.stdout.write(self.style.SUCCESS(
+                f"Built derivatives for {built} products; card images are {original_bytes / max(card_bytes, 1):.1f}x "
+                f"smaller than the originals"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("All product image derivatives are up to date"))
@@ -0,0 +1,29 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from products.catalog_io import FORMATS, export_rows, guess_format, write_rows
+
+
+class Command(BaseCommand):
+    help = "Write every product as CSV or JSONL to a file (or '-' for stdout)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        started = time.perf_counter()
+        if path == '-':
+            count = write_rows(sys.stdout, fmt, export_rows(options['batch_size']))
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                count = write_rows(stream, fmt, export_rows(options['batch_size']))
+        elapsed = time.perf_counter() - started
+        # stdout may be the export itself, so report on stderr.
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {count} products in {elapsed:.1f}s, {count / max(elapsed, 1e-9):.0f} rows/s"
+        ))
@@ -0,0 +1,50 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from products import homepage, images
+from products.catalog_io import FORMATS, CatalogImporter, guess_format, read_rows
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Upsert products from a CSV or JSONL file (or '-' for stdin), keyed on slug"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-errors', type=int, default=100, help="Abort after this many bad rows")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        search = get_search_backend()
+        started = time.perf_counter()
+
+        def on_batch(product_ids, new_image_ids, stats):
+            # bulk_create sends no post_save, so keep the search index and image derivatives current here.
+            search.index_products(product_ids)
+            for product_id in new_image_ids:
+                images.schedule(product_id)
+            if len(stats.errors) > options['max_errors']:
+                raise CommandError(f"Too many bad rows, stopped after {stats.rows} imported: {stats.errors[:5]}")
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{stats.rows} rows, {stats.rows / (time.perf_counter() - started):.0f} rows/s")
+
+        importer = CatalogImporter(batch_size=options['batch_size'], on_batch=on_batch)
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(e)
+        with stream:
+            stats = importer.run(read_rows(stream, fmt))
+        homepage.invalidate()
+        elapsed = time.perf_counter() - started
+
+        for line_number, error in stats.errors[:20]:
+            self.stderr.write(f"line {line_number}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.rows} products ({stats.created} created, {stats.updated} updated, "
+            f"{len(stats.errors)} rejected) in {elapsed:.1f}s, {stats.rows / max(elapsed, 1e-9):.0f} rows/s"
+        ))
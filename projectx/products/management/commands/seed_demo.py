@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.core.files import File
 import os
 from django.conf import settings
+from products.images import STATIC_FALLBACKS
 from products.models import Category, Product, Tag
 
 
@@ -28,27 +29,27 @@ class Command(BaseCommand):
 
         demo_products = [
             # Children (5)
-            ("kids-shoe", "Kids Shoe", "children", 19.99, ["new", "sale"], "kids_shoe.png"),
-            ("kids-hat", "Kids Hat", "children", 9.99, ["summer"], "kids_hat.png"),
-            ("kids-tshirt", "Kids T-Shirt", "children", 12.99, ["summer"], "kids_tshirt.png"),
-            ("kids-jacket", "Kids Jacket", "children", 34.99, ["classic"], "kids_jacket.png"),
-            ("kids-backpack", "Kids Backpack", "children", 24.99, ["new"], "kids_backpack.png"),
+            ("kids-shoe", "Kids Shoe", "children", 19.99, ["new", "sale"]),
+            ("kids-hat", "Kids Hat", "children", 9.99, ["summer"]),
+            ("kids-tshirt", "Kids T-Shirt", "children", 12.99, ["summer"]),
+            ("kids-jacket", "Kids Jacket", "children", 34.99, ["classic"]),
+            ("kids-backpack", "Kids Backpack", "children", 24.99, ["new"]),
             # Men (5)
-            ("mens-shirt", "Men's Shirt", "men", 29.99, ["classic"], "menshirt.png"),
-            ("mens-pant", "Men's Pant", "men", 49.99, ["sale"], "menspant.jpg"),
-            ("mens-sneaker", "Men's Sneaker", "men", 69.99, ["new"], "mensneaker.jpg"),
-            ("mens-watch", "Men's Watch", "men", 89.99, ["classic"], "menwatch.png"),
-            ("mens-hoodie", "Men's Hoodie", "men", 39.99, ["summer"], "menshoodie.png"),
+            ("mens-shirt", "Men's Shirt", "men", 29.99, ["classic"]),
+            ("mens-pant", "Men's Pant", "men", 49.99, ["sale"]),
+            ("mens-sneaker", "Men's Sneaker", "men", 69.99, ["new"]),
+            ("mens-watch", "Men's Watch", "men", 89.99, ["classic"]),
+            ("mens-hoodie", "Men's Hoodie", "men", 39.99, ["summer"]),
             # Women (5)
-            ("womens-dress", "Women's Dress", "women", 59.99, ["new"], "womens_dress.png"),
-            ("womens-bag", "Women's Bag", "women", 39.99, ["classic", "sale"], "placeholder.png"),
-            ("womens-heels", "Women's Heels", "women", 74.99, ["classic"], "placeholder.png"),
-            ("womens-top", "Women's Top", "women", 29.99, ["summer"], "placeholder.png"),
-            ("womens-jacket", "Women's Jacket", "women", 69.99, ["new"], "placeholder.png"),
+            ("womens-dress", "Women's Dress", "women", 59.99, ["new"]),
+            ("womens-bag", "Women's Bag", "women", 39.99, ["classic", "sale"]),
+            ("womens-heels", "Women's Heels", "women", 74.99, ["classic"]),
+            ("womens-top", "Women's Top", "women", 29.99, ["summer"]),
+            ("womens-jacket", "Women's Jacket", "women", 69.99, ["new"]),
         ]
 
         created = 0
-        for slug, name, cat_slug, price, tag_slugs, image_filename in demo_products:
+        for slug, name, cat_slug, price, tag_slugs in demo_products:
             category = created_categories[cat_slug]
             product, was_created = Product.objects.get_or_create(
                 slug=slug,
@@ -68,7 +69,8 @@ class Command(BaseCommand):
                 product.save()
             
             # Handle image upload
-            if not product.image and image_filename != "placeholder.png":
+            image_filename = STATIC_FALLBACKS.get(slug)
+            if not product.image and image_filename:
                 static_image_path = os.path.join(settings.BASE_DIR, '..', 'static', image_filename)
                 if os.path.exists(static_image_path):
                     with open(static_image_path, 'rb') as f:
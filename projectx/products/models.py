@@ -1,5 +1,7 @@
 from django.db import models
 
+from . import images
+
 
 class Category(models.Model):
     CATEGORY_CHOICES = [
@@ -9,6 +11,7 @@ class Category(models.Model):
     ]
     slug = models.SlugField(max_length=50, unique=True)
     name = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -32,14 +35,46 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    # Resized copies of ``image``, maintained by products.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     @property
     def image_url(self):
-        if self.image:
-            return self.image.url
-        return '/static/placeholder.png'
+        return images.image_url(self)
+
+    @property
+    def current_derivatives(self):
+        """``image_derivatives`` if they were rendered from the current image, else ``{}``."""
+        # Stale after the image is replaced, until products.images rebuilds them.
+        return {} if images.needs_build(self) else self.image_derivatives or {}
+
+    @property
+    def image_sources(self):
+        """AVIF/WebP ``<source>`` entries, empty until the derivatives are built."""
+        return images.sources(self.current_derivatives)
+
+    @property
+    def image_srcset(self):
+        """srcset of the resized JPEG/PNG copies, for browsers without AVIF or WebP."""
+        derivatives = self.current_derivatives
+        return images.srcset(derivatives, derivatives.get('fallback'))
+
+    def image_variant_url(self, size='card'):
+        """URL of the ``size`` copy ('thumb', 'card' or 'detail'), or image_url if there is none yet."""
+        return images.variant_url(self.current_derivatives, size) or self.image_url
     tags = models.ManyToManyField(Tag, related_name='products', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also bump it in queryset.update() calls that change what pages show (see products.conditional)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of category listings (products.pagination)
+            models.Index(fields=['category', '-created_at', '-id'], name='product_category_recent_idx'),
+            # MAX(updated_at) per category for conditional GETs
+            models.Index(fields=['category', 'updated_at'], name='product_category_updated_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -0,0 +1,64 @@
+"""
+Keyset (cursor) pagination for product listings.
+
+Pages are ordered newest first on (created_at, id) and the cursor is the
+position of the last product shown, so fetching page N costs the same as
+page 1. The (category, -created_at, -id) index on Product serves the query.
+"""
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+
+ORDERING = ('-created_at', '-id')
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(product) -> str:
+    raw = f'{product.created_at.isoformat()}|{product.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(created_at, id)`` from a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def after_cursor(queryset, cursor):
+    """``queryset`` ordered for keyset paging and starting after ``cursor``."""
+    queryset = queryset.order_by(*ORDERING)
+    position = decode_cursor(cursor)
+    if position is None:
+        return queryset
+    created_at, pk = position
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+
+def split_page(rows, size) -> KeysetPage:
+    """Turn ``size + 1`` fetched rows into a page and the cursor for the next one."""
+    rows = list(rows)
+    if len(rows) > size:
+        rows = rows[:size]
+        return KeysetPage(items=rows, next_cursor=encode_cursor(rows[-1]))
+    return KeysetPage(items=rows, next_cursor=None)
+
+
+def keyset_page(queryset, cursor, size) -> KeysetPage:
+    return split_page(after_cursor(queryset, cursor)[:size + 1], size)
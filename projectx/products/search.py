@@ -0,0 +1,147 @@
+"""
+Pluggable product search.
+
+The backend is chosen with ``settings.PRODUCT_SEARCH_BACKEND``. Every backend
+returns a lazily sliceable result object, so it can be handed straight to
+``django.core.paginator.Paginator``.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Product, Tag
+
+FTS_TABLE = 'products_product_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """Base class; the index hooks are no-ops for backends without an index."""
+
+    def is_available(self) -> bool:
+        return True
+
+    def search(self, query):
+        raise NotImplementedError
+
+    def index_products(self, product_ids) -> None:
+        pass
+
+    def remove_products(self, product_ids) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        pass
+
+
+class ORMSearchBackend(SearchBackend):
+    """The original icontains query: scans the product table on every search."""
+
+    def search(self, query):
+        return Product.objects.select_related('category').filter(
+            Q(name__icontains=query) | Q(description__icontains=query) | Q(tags__name__icontains=query)
+        ).distinct().order_by('-created_at', '-id')
+
+
+class FTSResults:
+    """Ranked FTS5 matches, fetched one page at a time."""
+
+    def __init__(self, match):
+        self.match = match
+        self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [self.match])
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        if not self.match or stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            # Column weights: name, description, tags.
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 5.0) LIMIT %s OFFSET %s',
+                [self.match, stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        products = Product.objects.select_related('category').in_bulk(ids)
+        return [products[pk] for pk in ids if pk in products]
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Inverted index kept in an SQLite FTS5 virtual table (see migration 0003).
+    Every query token is matched as a prefix, so "sne" finds "Sneaker".
+    """
+
+    def is_available(self) -> bool:
+        return connection.vendor == 'sqlite'
+
+    def search(self, query):
+        tokens = tokenize(query)
+        return FTSResults(' '.join(f'"{t}"*' for t in tokens))
+
+    def _index_sql(self, where=''):
+        product_table = Product._meta.db_table
+        tag_table = Tag._meta.db_table
+        through_table = Product.tags.through._meta.db_table
+        return (
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description, tags) '
+            f'SELECT p.id, p.name, p.description, COALESCE(('
+            f'  SELECT group_concat(t.name, \' \') FROM {tag_table} t '
+            f'  JOIN {through_table} pt ON pt.tag_id = t.id WHERE pt.product_id = p.id'
+            f'), \'\') FROM {product_table} p {where}'
+        )
+
+    def index_products(self, product_ids) -> None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', product_ids)
+            cursor.execute(self._index_sql(f'WHERE p.id IN ({placeholders})'), product_ids)
+
+    def remove_products(self, product_ids) -> None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', product_ids)
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(self._index_sql())
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> SearchBackend:
+    path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', 'products.search.ORMSearchBackend')
+    backend = import_string(path)()
+    if not backend.is_available():
+        return ORMSearchBackend()
+    return backend
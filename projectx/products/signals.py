@@ -0,0 +1,79 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cards, homepage, images
+from .models import Category, Product, Tag
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    get_search_backend().remove_products([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def reindex_product_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # tag.products.clear(): remember who loses the tag before the rows go.
+        instance._search_product_ids = list(instance.products.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        product_ids = [instance.pk]
+    elif action == 'post_clear':
+        product_ids = getattr(instance, '_search_product_ids', [])
+    else:
+        product_ids = pk_set or []
+    get_search_backend().index_products(product_ids)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    get_search_backend().index_products(instance.products.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_products(sender, instance, **kwargs):
+    instance._search_product_ids = list(instance.products.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_deleted_tag(sender, instance, **kwargs):
+    get_search_backend().index_products(getattr(instance, '_search_product_ids', []))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_homepage(sender, action='post_save', **kwargs):
+    if action.startswith('post_'):
+        homepage.invalidate()
+
+
+@receiver(post_save, sender=Product)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw and images.needs_build(instance):
+        images.schedule(instance.pk)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_product_cards(sender, action='post_save', **kwargs):
+    # Search result cards list the product's tags, which don't touch Product.updated_at.
+    if action.startswith('post_'):
+        cards.invalidate()
@@ -0,0 +1,17 @@
+from django import template
+
+from products import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def product_cards(context, products, tags=False, next_path=None):
+    """
+    Render a list of product cards, cached per product.
+    Usage: {% product_cards products %} or {% product_cards products tags=True next_path=request.get_full_path %}
+    """
+    if next_path is None:
+        request = context.get('request')
+        next_path = context.get('next_path') or (request.path if request is not None else '')
+    return cards.render_cards(products, next_path, tags)
@@ -0,0 +1,22 @@
+from django import template
+
+from products import images
+
+register = template.Library()
+
+
+@register.inclusion_tag('products/_picture.html')
+def product_picture(product, size='card', css_class='', loading='lazy'):
+    """
+    Render a product image as a responsive <picture>.
+    Usage: {% product_picture p 'card' 'w-full h-48 object-cover' %}
+    """
+    return {
+        'product': product,
+        'sources': product.image_sources,
+        'src': product.image_variant_url(size),
+        'srcset': product.image_srcset,
+        'sizes': images.SLOT_SIZES[size],
+        'css_class': css_class,
+        'loading': loading,
+    }
@@ -0,0 +1,132 @@
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from accounts.models import UserProfile
+from projectx.testing import CacheIsolationMixin, QueryBudgetTestCase
+
+from .catalog_io import CatalogImporter, RowError, read_rows
+from .models import Category, Product, Tag
+from .search import get_search_backend
+
+
+class CatalogImportTests(CacheIsolationMixin, TestCase):
+    def test_jsonl_rows_that_are_not_objects_are_row_errors(self):
+        stream = io.StringIO('[1, 2]\n"x"\n{"slug": "shirt", "name": "Shirt", "category": "men", "price": "9.99"}\n')
+        rows = list(read_rows(stream, 'jsonl'))
+        self.assertIsInstance(rows[0][1], RowError)
+        self.assertIsInstance(rows[1][1], RowError)
+        stats = CatalogImporter().run(rows)
+        self.assertEqual(stats.created, 1)
+        self.assertEqual([line for line, _ in stats.errors], [1, 2])
+
+    def test_categories_and_tags_without_a_slug_are_row_errors(self):
+        csv_file = io.StringIO(
+            'slug,name,category,price,description,tags,image\n'
+            'shirt,Shirt,!!!,9.99,,,\n'
+            'hat,Hat,men,5.00,,sale|???,\n'
+            'cap,Cap,men,5.00,,sale,\n'
+        )
+        stats = CatalogImporter().run(read_rows(csv_file, 'csv'))
+        self.assertEqual((stats.created, [line for line, _ in stats.errors]), (1, [2, 3]))
+        self.assertFalse(Category.objects.filter(slug='').exists())
+        self.assertFalse(Tag.objects.filter(slug='').exists())
+
+    def test_blank_image_keeps_the_current_image(self):
+        csv_file = io.StringIO(
+            'slug,name,category,price,description,tags,image\n'
+            'shirt,Shirt,men,9.99,,,products/shirt.png\n'
+            'hat,Hat,men,5.00,,,products/hat.png\n'
+        )
+        CatalogImporter().run(read_rows(csv_file, 'csv'))
+        for slug in ('shirt', 'hat'):
+            Product.objects.filter(slug=slug).update(image_derivatives={
+                'source': f'products/{slug}.png', 'fallback': 'png',
+                'formats': {'png': [[480, f'products/derivatives/{slug}-480w.png', 100]]},
+            })
+        csv_file = io.StringIO(
+            'slug,name,category,price,description,tags,image\n'
+            'shirt,Shirt,men,12.00,,,\n'
+            'hat,Hat,men,5.00,,,products/hat-v2.png\n'
+        )
+        batches = []
+        stats = CatalogImporter(on_batch=lambda ids, new_image_ids, stats: batches.append(new_image_ids)).run(
+            read_rows(csv_file, 'csv')
+        )
+        self.assertEqual(stats.updated, 2)
+        shirt, hat = Product.objects.get(slug='shirt'), Product.objects.get(slug='hat')
+        self.assertEqual((shirt.price, shirt.image.name), (Decimal('12.00'), 'products/shirt.png'))
+        self.assertEqual(shirt.image_variant_url('card'), '/media/products/derivatives/shirt-480w.png')
+        # The new image's derivatives are rebuilt; until then pages show the image itself.
+        self.assertEqual(hat.image.name, 'products/hat-v2.png')
+        self.assertEqual(hat.image_derivatives, {})
+        self.assertEqual(hat.image_variant_url('card'), hat.image_url)
+        self.assertEqual(batches, [[hat.pk]])
+
+
+class ProductImageTests(TestCase):
+    def test_derivatives_of_a_replaced_image_are_not_served(self):
+        product = Product(slug='hat', image='products/hat-v2.png', image_derivatives={
+            'source': 'products/hat.png', 'fallback': 'png',
+            'formats': {'png': [[480, 'products/derivatives/hat-480w.png', 100]],
+                        'webp': [[480, 'products/derivatives/hat-480w.webp', 80]]},
+        })
+        self.assertEqual((product.image_sources, product.image_srcset), ([], ''))
+        self.assertEqual(product.image_variant_url('card'), '/media/products/hat-v2.png')
+        product.image = 'products/hat.png'
+        self.assertEqual(product.image_variant_url('card'), '/media/products/derivatives/hat-480w.png')
+
+
+class ProductsQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(slug='men', name='Men')
+        self.products = [
+            Product.objects.create(category=self.category, name=f'Shirt {i}', slug=f'shirt-{i}', price=Decimal('10.00'))
+            for i in range(3)
+        ]
+        get_search_backend().rebuild()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'correct-horse')
+
+    def test_catalog_pages(self):
+        self.assertWithinQueryBudget('products:home')
+        self.assertWithinQueryBudget('products:category_list', 'men')
+        self.assertWithinQueryBudget('products:category_products', 'men')
+        self.assertWithinQueryBudget('products:product_detail', 'shirt-0')
+        response = self.assertWithinQueryBudget('products:search', data={'q': 'shirt'})
+        self.assertEqual(len(response.context['products']), 3)
+
+    def test_catalog_pages_logged_in(self):
+        self.client.force_login(self.user)
+        self.assertWithinQueryBudget('products:home')
+        self.assertWithinQueryBudget('products:category_list', 'men')
+        self.assertWithinQueryBudget('products:product_detail', 'shirt-0')
+        self.assertWithinQueryBudget('products:search', data={'q': 'shirt'})
+
+    def test_add_product(self):
+        UserProfile.objects.update_or_create(user=self.user, defaults={'is_admin': True})
+        self.client.force_login(self.user)
+        self.assertWithinQueryBudget('products:add_product')
+        response = self.assertWithinQueryBudget('products:add_product', method='post', data={
+            'name': 'Hat', 'slug': 'hat', 'description': '', 'price': '5.00', 'category': self.category.pk,
+        })
+        self.assertRedirects(response, '/hat/', fetch_redirect_response=False)
+
+    def test_cart(self):
+        self.client.force_login(self.user)
+        for product in self.products:
+            self.assertWithinQueryBudget('products:add_to_cart', product.slug)
+        self.assertWithinQueryBudget('products:add_to_cart', 'shirt-0')
+        self.assertWithinQueryBudget('products:decrease_from_cart', 'shirt-0')
+        response = self.assertWithinQueryBudget('products:cart_view')
+        self.assertEqual(len(response.context['items']), 3)
+        self.assertWithinQueryBudget('products:remove_from_cart', 'shirt-1')
+
+    def test_anonymous_cart(self):
+        for product in self.products:
+            self.assertWithinQueryBudget('products:add_to_cart', product.slug)
+        self.assertWithinQueryBudget('products:decrease_from_cart', 'shirt-0')
+        response = self.assertWithinQueryBudget('products:cart_view')
+        self.assertEqual(len(response.context['items']), 2)
+        self.assertWithinQueryBudget('products:remove_from_cart', 'shirt-1')
@@ -1,18 +1,40 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'products'
 
+# Under ASGI the read-heavy catalog pages are served by native async views.
+catalog = async_views if settings.ASYNC_CATALOG_VIEWS else views
+
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('category/<slug:category_slug>/', views.category_list, name='category_list'),
-    path('search/', views.search, name='search'),
+    path('', catalog.home, name='home'),
+    path('category/<slug:category_slug>/', catalog.category_list, name='category_list'),
+    path('category/<slug:category_slug>/more/', views.category_products, name='category_products'),
+    path('search/', catalog.search, name='search'),
     path('add-product/', views.add_product, name='add_product'),  # Make sure this URL is correct
     path('<slug:slug>/add/', views.add_to_cart, name='add_to_cart'),
     path('<slug:slug>/dec/', views.decrease_from_cart, name='decrease_from_cart'),
     path('cart/', views.cart_view, name='cart_view'),
     path('cart/remove/<slug:slug>/', views.remove_from_cart, name='remove_from_cart'),
-    path('<slug:slug>/', views.product_detail, name='product_detail'),
+    path('<slug:slug>/', catalog.product_detail, name='product_detail'),
 ]
 
-
+# Max queries per request (see projectx.instrumentation)
+QUERY_BUDGETS = {
+    # On a cold cache, logged in: two freshness checks, user, role, shelves.
+    # Anonymous it is 3; with the shelves cached, the checks alone.
+    'home': 5,
+    'category_list': 4,
+    'category_products': 4,
+    'search': 5,
+    # User, category, INSERT and the search index update (DELETE, INSERT)
+    'add_product': 5,
+    # A user's first item: product, user, cart (SELECT, BEGIN, INSERT), BEGIN, cart
+    # lock, line UPDATE then INSERT (in a savepoint), totals UPDATE and re-read
+    'add_to_cart': 13,
+    'decrease_from_cart': 10,
+    'cart_view': 4,
+    'remove_from_cart': 10,
+    'product_detail': 3,
+}
@@ -1,25 +1,50 @@
+from decimal import Decimal
+from itertools import islice
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Prefetch, Q
-from django.http import JsonResponse
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.utils.functional import SimpleLazyObject
+from django.utils.safestring import mark_safe
 from django.utils.text import slugify
+from accounts.roles import get_user_role
+from . import homepage
+from .conditional import catalog_page, category_state, home_state, product_state
 from .models import Category, Product, Tag
+from .pagination import after_cursor, encode_cursor, keyset_page
+from .search import get_search_backend
+from orders import cart_service
+from orders.cart_store import get_cart_store
 from orders.models import Cart
 
+SEARCH_PAGE_SIZE = 24
+CATEGORY_PAGE_SIZE = 48
+STREAM_CHUNK_SIZE = 12
+# Placeholders cut out of the rendered category page when streaming it
+STREAM_ITEMS = '<!--stream:items-->'
+STREAM_MORE = '<!--stream:more-->'
+
 
 def is_admin(user):
-    return user.is_authenticated and user.profile.is_admin
+    return get_user_role(user).is_admin
 
 
+@catalog_page(home_state)
 def home(request):
-    children = Product.objects.filter(category__slug='children')[:4]
-    men = Product.objects.filter(category__slug='men')[:4]
-    women = Product.objects.filter(category__slug='women')[:4]
+    site = request.get_host()
+    version = homepage.get_version()
+    # Only evaluated when a shelf fragment is missing from the cache.
+    shelves = SimpleLazyObject(lambda: homepage.get_shelves(site, version))
     return render(request, 'home.html', {
-        'children_products': children,
-        'men_products': men,
-        'women_products': women,
+        'shelves': shelves,
+        'site': site,
+        'homepage_version': version,
+        'shelf_cache_timeout': homepage.CACHE_TIMEOUT,
     })
 
 
@@ -56,17 +81,81 @@ def add_product(request):
     return render(request, 'products/add_product.html')
 
 
+def _category_products(category):
+    return category.products.select_related('category')
+
+
+@catalog_page(category_state)
 def category_list(request, category_slug):
     category = get_object_or_404(Category, slug=category_slug)
-    products = category.products.select_related('category').prefetch_related('tags').all()
+    products = _category_products(category)
+    if getattr(settings, 'CATEGORY_STREAMING', False):
+        return _stream_category(request, category, products)
+    page = keyset_page(products, request.GET.get('cursor'), CATEGORY_PAGE_SIZE)
     return render(request, 'products/category_list.html', {
         'category': category,
-        'products': products,
+        'products': page.items,
+        'next_cursor': page.next_cursor,
     })
 
 
+@catalog_page(category_state)
+def category_products(request, category_slug):
+    """Next page of a category listing as an HTML fragment, for infinite scroll."""
+    category = get_object_or_404(Category, slug=category_slug)
+    page = keyset_page(_category_products(category), request.GET.get('cursor'), CATEGORY_PAGE_SIZE)
+    html = render_to_string('products/_product_cards.html', {
+        'products': page.items,
+        'next_path': reverse('products:category_list', args=[category.slug]),
+    }, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
+
+
+def _stream_shell(request, category):
+    """The rendered category page split around its product list: ``(head, tail)``."""
+    shell = render_to_string('products/category_list.html', {
+        'category': category,
+        'stream_items': mark_safe(STREAM_ITEMS),
+        'stream_more': mark_safe(STREAM_MORE),
+    }, request=request)
+    return shell.split(STREAM_ITEMS)
+
+
+def _stream_footer(request, category, tail, shown, last, has_more) -> str:
+    empty = '' if shown else '<p class="col-span-full text-gray-500 text-center py-10">No products found.</p>'
+    more = render_to_string('products/_load_more.html', {
+        'category': category, 'next_cursor': encode_cursor(last) if has_more else None,
+    }, request=request)
+    return empty + tail.replace(STREAM_MORE, more)
+
+
+def _stream_category(request, category, products):
+    """
+    Send the page shell right away and stream the product cards in chunks as
+    they come off the cursor, so the first byte doesn't wait for the whole page.
+    """
+    head, tail = _stream_shell(request, category)
+    rows = after_cursor(products, request.GET.get('cursor'))[:CATEGORY_PAGE_SIZE + 1]
+
+    def chunks():
+        yield head
+        shown, last, has_more = 0, None, False
+        products = rows.iterator(chunk_size=STREAM_CHUNK_SIZE)
+        while batch := list(islice(products, STREAM_CHUNK_SIZE)):
+            if shown + len(batch) > CATEGORY_PAGE_SIZE:
+                has_more = True
+                batch = batch[:CATEGORY_PAGE_SIZE - shown]
+            if batch:
+                shown, last = shown + len(batch), batch[-1]
+                yield render_to_string('products/_product_cards.html', {'products': batch}, request=request)
+        yield _stream_footer(request, category, tail, shown, last, has_more)
+
+    return StreamingHttpResponse(chunks(), content_type='text/html; charset=utf-8')
+
+
+@catalog_page(product_state)
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug)
+    product = get_object_or_404(Product.objects.select_related('category'), slug=slug)
     return render(request, 'products/product_detail.html', {
         'product': product,
     })
@@ -74,17 +163,23 @@ def product_detail(request, slug):
 
 def add_to_cart(request, slug):
     product = get_object_or_404(Product, slug=slug)
+    mutation = None
     if request.user.is_authenticated:
         user_cart = Cart.get_for_user(request.user)
-        user_cart.add_product(product, 1)
+        mutation = cart_service.increment(user_cart, product, 1)
     else:
-        cart = request.session.get('cart', {})
-        cart[str(product.id)] = cart.get(str(product.id), 0) + 1
-        request.session['cart'] = cart
+        store = get_cart_store(request)
+        quantity = store.add(product.id)
     
     # Check if it's an AJAX request
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({'success': True, 'message': f'{product.name} added to cart'})
+        data = {'success': True, 'message': f'{product.name} added to cart'}
+        if mutation:
+            data['quantity'] = mutation.line.quantity
+            data['cart'] = mutation.totals.as_dict()
+        else:
+            data['quantity'] = quantity
+        return JsonResponse(data)
     
     next_url = request.GET.get('next') or request.META.get('HTTP_REFERER') or 'products:home'
     return redirect(next_url)
@@ -92,21 +187,19 @@ def add_to_cart(request, slug):
 
 def cart_view(request):
     items = []
-    total = 0.0
+    total = Decimal('0.00')
     if request.user.is_authenticated:
         user_cart = Cart.get_for_user(request.user)
-        cart_items = user_cart.items.select_related('product')
-        for ci in cart_items:
-            lt = float(ci.unit_price) * ci.quantity
-            total += lt
-            items.append({'product': ci.product, 'quantity': ci.quantity, 'line_total': lt})
+        for ci in user_cart.items.select_related('product'):
+            items.append({'product': ci.product, 'quantity': ci.quantity, 'line_total': ci.line_total()})
+        total = user_cart.subtotal_amount
     else:
-        cart = request.session.get('cart', {})
+        cart = get_cart_store(request).items()
         if cart:
             products = Product.objects.filter(id__in=cart.keys())
             for product in products:
-                quantity = cart.get(str(product.id), 0)
-                line_total = quantity * float(product.price)
+                quantity = cart.get(product.id, 0)
+                line_total = quantity * product.price
                 total += line_total
                 items.append({'product': product, 'quantity': quantity, 'line_total': line_total})
     return render(request, 'orders/cart.html', {'items': items, 'total': total})
@@ -116,12 +209,9 @@ def remove_from_cart(request, slug):
     product = get_object_or_404(Product, slug=slug)
     if request.user.is_authenticated:
         user_cart = Cart.get_for_user(request.user)
-        user_cart.remove_product(product)
+        cart_service.remove(user_cart, product)
     else:
-        cart = request.session.get('cart', {})
-        if str(product.id) in cart:
-            cart.pop(str(product.id))
-            request.session['cart'] = cart
+        get_cart_store(request).remove(product.id)
     next_url = request.GET.get('next') or request.META.get('HTTP_REFERER') or 'products:cart_view'
     return redirect(next_url)
 
@@ -130,49 +220,36 @@ def decrease_from_cart(request, slug):
     product = get_object_or_404(Product, slug=slug)
     if request.user.is_authenticated:
         user_cart = Cart.get_for_user(request.user)
-        # emulate decrement: set quantity - 1
-        try:
-            ci = user_cart.items.get(product=product)
-            if ci.quantity > 1:
-                ci.quantity -= 1
-                ci.save()
-            else:
-                ci.delete()
-        except Exception:
-            pass
+        cart_service.decrement(user_cart, product, 1)
     else:
-        cart = request.session.get('cart', {})
-        pid = str(product.id)
-        if pid in cart:
-            if cart[pid] > 1:
-                cart[pid] -= 1
-            else:
-                cart.pop(pid)
-            request.session['cart'] = cart
+        get_cart_store(request).decrease(product.id)
     next_url = request.GET.get('next') or request.META.get('HTTP_REFERER') or 'products:cart_view'
     return redirect(next_url)
 
 
+def _search_page(query, page_number):
+    paginator = Paginator(get_search_backend().search(query), SEARCH_PAGE_SIZE)
+    return paginator.get_page(page_number)
+
+
 def search(request):
     query = request.GET.get('q', '').strip()
     products = []
+    page_obj = None
     if query:
-        products = Product.objects.select_related('category').prefetch_related('tags').filter(
-            Q(name__icontains=query) | Q(description__icontains=query) | Q(tags__name__icontains=query)
-        ).distinct()
-    return render(request, 'products/search_results.html', {'query': query, 'products': products})
+        page_obj = _search_page(query, request.GET.get('page'))
+        products = page_obj.object_list
+    return render(request, 'products/search_results.html', {
+        'query': query,
+        'products': products,
+        'page_obj': page_obj,
+    })
 
 
 @login_required
 def add_product(request):
     # Check if user is admin
-    try:
-        is_admin = request.user.profile.is_admin
-    except:
-        # If UserProfile doesn't exist, check if user is superuser as fallback
-        is_admin = request.user.is_superuser
-    
-    if not is_admin:
+    if not request.user_role.is_admin:
         messages.error(request, 'Access denied. Only admin users can add products.')
         return redirect('products:home')
     
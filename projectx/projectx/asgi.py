@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'projectx.settings')
+# Native async catalog views (products.async_views); set to 0 to serve the sync ones.
+os.environ.setdefault('ASYNC_CATALOG_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,143 @@
+"""
+SQL query instrumentation.
+
+``QueryRecorder`` counts the queries run inside a block, their total time and
+the statements that ran more than once (the usual sign of an N+1).
+``QueryInstrumentationMiddleware`` (opt-in with ``QUERY_INSTRUMENTATION``)
+records every request, reports it in a ``Server-Timing`` header and a
+structured log line, and warns when a view goes over its query budget.
+
+Budgets are declared per URL name in each app's urls.py::
+
+    QUERY_BUDGETS = {'home': 2, 'cart_view': 6}
+
+``QueryBudgetTestMixin.assertWithinQueryBudget`` fails a test when a URL
+runs more queries than its budget allows.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from importlib import import_module
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+
+logger = logging.getLogger('projectx.queries')
+
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s|\?)(?:,\s*(?:%s|\?))*\)', re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so the same query with different values compares equal."""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _LITERAL_RE.sub('?', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Context manager that records every query on every database connection."""
+
+    def __init__(self, using=None):
+        self.aliases = [using] if using else list(connections)
+        self.queries = []
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in self.aliases:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time_ms(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self) -> dict:
+        """``{fingerprint: times_run}`` for statements that ran more than once."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {fp: n for fp, n in counts.items() if n > 1}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_time_ms:.1f};desc="{self.count} queries"'
+
+
+def get_query_budget(resolver_match):
+    """The budget declared in ``<app>.urls.QUERY_BUDGETS`` for a resolved URL, if any."""
+    if resolver_match is None or not resolver_match.app_name or not resolver_match.url_name:
+        return None
+    try:
+        urls = import_module(f'{resolver_match.app_name}.urls')
+    except ImportError:
+        return None
+    return getattr(urls, 'QUERY_BUDGETS', {}).get(resolver_match.url_name)
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        budget = get_query_budget(match)
+        duplicates = recorder.duplicates()
+        response['Server-Timing'] = ', '.join(filter(None, [response.get('Server-Timing'), recorder.server_timing()]))
+
+        log = logger.warning if budget is not None and recorder.count > budget else logger.info
+        log(
+            'view=%s queries=%d budget=%s duplicates=%d db_ms=%.1f',
+            view, recorder.count, budget, sum(duplicates.values()), recorder.total_time_ms,
+            extra={
+                'view': view,
+                'query_count': recorder.count,
+                'query_budget': budget,
+                'duplicate_queries': duplicates,
+                'db_time_ms': round(recorder.total_time_ms, 2),
+            },
+        )
+        return response
+
+
+class QueryBudgetTestMixin:
+    """Mix into a django.test.TestCase to enforce the per-URL query budgets."""
+
+    def assertWithinQueryBudget(self, url_name, *args, method='get', data=None, client=None, **kwargs):
+        app_name, _, name = url_name.rpartition(':')
+        budget = getattr(import_module(f'{app_name}.urls'), 'QUERY_BUDGETS', {}).get(name)
+        if budget is None:
+            self.fail(f'No query budget declared for {url_name}')
+        client = client or self.client
+        with QueryRecorder() as recorder:
+            response = getattr(client, method)(reverse(url_name, args=args, kwargs=kwargs), data)
+        if recorder.count > budget:
+            duplicates = '\n'.join(f'  {n}x {fp}' for fp, n in recorder.duplicates().items())
+            self.fail(
+                f'{url_name} ran {recorder.count} queries, budget is {budget}'
+                + (f'\nDuplicated:\n{duplicates}' if duplicates else '')
+            )
+        return response
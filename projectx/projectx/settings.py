@@ -10,7 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
-
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,20 +42,31 @@ INSTALLED_APPS = [
     'accounts',
     'products',
     'orders',
+    'notifications',
+    'jobs',
+    'inventory',
+    'analytics',
 ]
 
 MIDDLEWARE = [
+    'projectx.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserRoleMiddleware',
+    'orders.cart_store.AnonymousCartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Query count / DB time per request as Server-Timing headers and log lines.
+# Budgets live in QUERY_BUDGETS in each app's urls.py.
+QUERY_INSTRUMENTATION = False
+
 # Session configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Session expires when browser closes
 
@@ -87,9 +98,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Job and image worker threads write concurrently with requests: take the write
+        # lock when a transaction starts so SQLite waits for it instead of failing.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
     }
 }
 
+# Caches. 'default' is shared by every process (sessions, anonymous carts); use
+# django.core.cache.backends.db.DatabaseCache, after `manage.py createcachetable`,
+# to share it through the database instead of files.
+# The tiered caches put a per-process LRU in front of it for read-mostly data
+# (caching.backends); their entries may lag other processes by LOCAL_TIMEOUT seconds.
+CACHES = {
+    'default': {
+        'BACKEND': 'caching.backends.FileCache',
+        'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'var' / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'tiered': {
+        'BACKEND': 'caching.backends.TieredCache',
+        'LOCATION': 'tiered',
+        'OPTIONS': {'SHARED': 'default', 'LOCAL_MAX_ENTRIES': 2000, 'LOCAL_TIMEOUT': 5},
+    },
+    # Used by {% cache %}
+    'template_fragments': {
+        'BACKEND': 'caching.backends.TieredCache',
+        'LOCATION': 'template_fragments',
+        # Room for a few thousand product cards (products.cards)
+        'OPTIONS': {'SHARED': 'default', 'LOCAL_MAX_ENTRIES': 5000, 'LOCAL_TIMEOUT': 5},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -160,6 +199,60 @@ EMAIL_HOST_PASSWORD = ''
 EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = 'ShopX <no-reply@example.com>'
 
+# Email outbox (notifications.outbox): views queue messages, `manage.py drain_outbox --loop`
+# sends them. OUTBOX_EMAIL_BACKEND defaults to EMAIL_BACKEND; use the console or
+# 'django.core.mail.backends.filebased.EmailBackend' (with EMAIL_FILE_PATH) locally and in tests.
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 8
+
+# Background jobs (jobs.queue): run by JOBS_WORKERS in-process threads after the enqueueing
+# transaction commits (0 = right after commit, in the request thread). `manage.py run_jobs --loop`
+# picks up retries and anything an in-process pool didn't finish.
+JOBS_WORKERS = 2
+JOBS_BATCH_SIZE = 50
+JOBS_MAX_ATTEMPTS = 5
+JOBS_KEEP_DONE_DAYS = 7
+
+# Seconds checkout holds stock for an unpaid order before sweep_reservations releases it
+STOCK_RESERVATION_TTL = 15 * 60
+
+# Anonymous cart storage: SignedCookieCartStore, CacheCartStore or SessionCartStore
+ANONYMOUS_CART_STORE = 'orders.cart_store.SignedCookieCartStore'
+
+# Product search backend (falls back to the ORM backend on non-SQLite databases)
+PRODUCT_SEARCH_BACKEND = 'products.search.SQLiteFTSBackend'
+
+# Stream category pages (shell first, product cards as they are fetched)
+CATEGORY_STREAMING = False
+
+# Serve home, category, product and search pages from products.async_views.
+# projectx.asgi switches this on; under WSGI the sync views avoid an event loop per request.
+ASYNC_CATALOG_VIEWS = os.environ.get('ASYNC_CATALOG_VIEWS') == '1'
+
+# Threads that resize product images after upload (0 = resize in the request)
+PRODUCT_IMAGE_WORKERS = 2
+
+# Seconds a shared cache may serve anonymous catalog pages (products.conditional)
+CATALOG_CACHE_MAX_AGE = 60
+
+# Log in with a username or an email address (one indexed lookup, one password hash)
+AUTHENTICATION_BACKENDS = ['accounts.backends.EmailOrUsernameBackend']
+
+# Failed logins allowed per client IP and per username/email within a window of
+# LOGIN_THROTTLE_WINDOW seconds from the first failure, before accounts.throttling
+# refuses further attempts (without hashing them)
+LOGIN_THROTTLE_WINDOW = 15 * 60
+LOGIN_FAILURES_PER_IP = 30
+LOGIN_FAILURES_PER_ACCOUNT = 5
+
+# Sales rollups (analytics.rollup): paid orders rolled up per transaction, and how old an
+# order must be before it is rolled up, so orders still committing aren't skipped by the
+# checkpoint. The analytics.rollup_sales job reschedules itself every ROLLUP_INTERVAL seconds;
+# start it with `manage.py rollup_sales --schedule`.
+ANALYTICS_ROLLUP_BATCH_SIZE = 500
+ANALYTICS_SETTLE_SECONDS = 60
+ANALYTICS_ROLLUP_INTERVAL = 5 * 60
+
 # Currency Settings
 CURRENCY_SYMBOL = ' $ '  # Change this to your desired currency symbol (€, £, ¥, etc.)
 CURRENCY_CODE = 'dollar'  # Change this to your currency code (EUR, GBP, JPY, etc.)
@@ -0,0 +1,56 @@
+"""
+Shared test setup.
+
+``CacheIsolationMixin`` runs a TestCase against in-memory copies of the
+cache aliases in settings.CACHES, emptied before every test. Tests then
+don't share the file cache with a running dev server or with each other, and
+query budgets are measured against a cold cache, their worst case.
+
+``QueryBudgetTestCase`` is the base for the per-URL query budget tests (see
+projectx.instrumentation). It is a TransactionTestCase: inside a TestCase's
+wrapping transaction a view's BEGIN becomes a SAVEPOINT/RELEASE pair, one
+statement more than production runs. Queued jobs are not dispatched, since
+in production they run on worker threads after the response.
+"""
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TransactionTestCase, override_settings
+
+from .instrumentation import QueryBudgetTestMixin
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-default'},
+    'tiered': {
+        'BACKEND': 'caching.backends.TieredCache',
+        'LOCATION': 'test-tiered',
+        'OPTIONS': {'SHARED': 'default'},
+    },
+    'template_fragments': {
+        'BACKEND': 'caching.backends.TieredCache',
+        'LOCATION': 'test-template-fragments',
+        'OPTIONS': {'SHARED': 'default'},
+    },
+}
+
+
+class CacheIsolationMixin:
+    @classmethod
+    def setUpClass(cls):
+        cls._cache_override = override_settings(CACHES=TEST_CACHES)
+        cls._cache_override.enable()
+        cls.addClassCleanup(cls._cache_override.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+
+
+class QueryBudgetTestCase(CacheIsolationMixin, QueryBudgetTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        dispatch = mock.patch('jobs.queue._dispatch')
+        dispatch.start()
+        self.addCleanup(dispatch.stop)
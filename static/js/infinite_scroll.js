@@ -0,0 +1,43 @@
+// Infinite scroll for category listings: fetches the next keyset page as an HTML fragment
+document.addEventListener('DOMContentLoaded', function() {
+    const grid = document.getElementById('product-grid');
+    const button = document.getElementById('load-more');
+    if (!grid || !button) return;
+
+    let loading = false;
+
+    function loadMore() {
+        if (loading || !button.dataset.cursor) return;
+        loading = true;
+        button.textContent = 'Loading...';
+
+        const url = button.dataset.url + '?cursor=' + encodeURIComponent(button.dataset.cursor);
+        fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(response => {
+                if (!response.ok) throw new Error('Failed to load products');
+                return response.json();
+            })
+            .then(data => {
+                grid.insertAdjacentHTML('beforeend', data.html);
+                if (data.next_cursor) {
+                    button.dataset.cursor = data.next_cursor;
+                    button.textContent = 'Load more';
+                } else {
+                    observer.disconnect();
+                    button.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                button.textContent = 'Load more';
+            })
+            .finally(() => { loading = false; });
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadMore();
+    }, {rootMargin: '400px'});
+
+    observer.observe(button);
+    button.addEventListener('click', loadMore);
+});